@@ -5,9 +5,48 @@ pytest 配置和共享 fixtures
 import pytest
 import tempfile
 import os
+import sqlite3
+from datetime import datetime, timedelta
+from types import SimpleNamespace
 from typing import Dict, Any
+from hypothesis import HealthCheck, settings
 from weather_plugin.config import WeatherConfig
 from weather_plugin.plugin import WeatherPlugin
+from weather_plugin.user_preferences import UserPreferences
+
+try:
+    import uvloop
+except ImportError:  # uvloop 为可选依赖，缺失时异步测试使用标准事件循环
+    uvloop = None
+
+
+# Hypothesis 配置：默认使用较少样例的 ci 配置，可通过 HYPOTHESIS_PROFILE=full 恢复完整样例数
+# （显式指定 max_examples 的测试不受配置影响）
+settings.register_profile(
+    "ci",
+    max_examples=25,
+    deadline=None,
+    suppress_health_check=[HealthCheck.function_scoped_fixture],
+)
+settings.register_profile(
+    "full",
+    max_examples=100,
+    deadline=None,
+    suppress_health_check=[HealthCheck.function_scoped_fixture],
+)
+settings.load_profile(os.environ.get("HYPOTHESIS_PROFILE", "ci"))
+
+
+if uvloop is not None:
+    def pytest_asyncio_loop_factories(config, item):
+        """安装了 uvloop 时，异步测试在 uvloop 事件循环上运行"""
+        return {"uvloop": uvloop.new_event_loop}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_sqlite():
+    """会话开始时预热 SQLite，避免首个测试承担初始化开销"""
+    sqlite3.connect(":memory:").close()
 
 
 @pytest.fixture
@@ -30,7 +69,7 @@ default_language: "zh"
         os.unlink(temp_path)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def test_config() -> Dict[str, Any]:
     """测试配置"""
     return {
@@ -51,22 +90,57 @@ def weather_config(test_config) -> WeatherConfig:
     return WeatherConfig(**test_config)
 
 
+@pytest.fixture(scope="session")
+def shared_db(tmp_path_factory) -> str:
+    """整个测试会话共享的用户偏好数据库文件"""
+    return str(tmp_path_factory.mktemp("prefs") / "user_preferences.db")
+
+
 @pytest.fixture
+def user_prefs_manager() -> UserPreferences:
+    """用户偏好管理器（内存数据库，不涉及磁盘 IO）"""
+    return UserPreferences(":memory:")
+
+
+@pytest.fixture
+def file_prefs_manager(shared_db) -> UserPreferences:
+    """基于文件的用户偏好管理器（共享数据库，每个测试结束后清空数据），用于持久化测试"""
+    manager = UserPreferences(shared_db)
+    yield manager
+    manager.cleanup_database()
+
+
+@pytest.fixture(scope="module")
 def weather_plugin(test_config) -> WeatherPlugin:
-    """天气插件实例"""
-    return WeatherPlugin(test_config)
+    """天气插件实例（同一测试模块内共享）"""
+    plugin = WeatherPlugin(test_config)
+    yield plugin
+    plugin.close()
 
 
-class MockMessageEvent:
-    """模拟消息事件"""
-    def __init__(self, message: str, user_id: str = "test_user"):
-        self.message = message
-        self.user_id = user_id
+class FakeClock:
+    """可手动推进的假时钟，替代 time.sleep 保证时间戳单调递增"""
+    
+    def __init__(self, start: datetime):
+        self.current = start
+    
+    def __call__(self) -> datetime:
+        return self.current
+    
+    def advance(self, seconds: float) -> None:
+        self.current += timedelta(seconds=seconds)
 
 
 @pytest.fixture
+def fake_clock(monkeypatch) -> FakeClock:
+    """替换数据模型使用的当前时间"""
+    clock = FakeClock(datetime(2024, 1, 1, 8, 0, 0))
+    monkeypatch.setattr("weather_plugin.models._now", clock)
+    return clock
+
+@pytest.fixture(scope="session")
 def mock_message_event():
-    """模拟消息事件 fixture"""
+    """模拟消息事件 fixture，返回创建事件对象的工厂函数"""
     def _create_event(message: str, user_id: str = "test_user"):
-        return MockMessageEvent(message, user_id)
-    return _create_event
\ No newline at end of file
+        return SimpleNamespace(message=message, user_id=user_id)
+    return _create_event
@@ -260,6 +260,45 @@ class TestActivityRecommenderProperties:
                 assert weather_category in activity.suitable_weather, \
                     f"Activity {activity.name} not suitable for weather {weather_category}"
     
+    @given(
+        temperature=st.floats(min_value=-40.0, max_value=50.0),
+        humidity=st.integers(min_value=0, max_value=100),
+        wind_speed=st.floats(min_value=0.0, max_value=50.0),
+        visibility=st.floats(min_value=0.1, max_value=50.0),
+        uv_index=st.floats(min_value=0.0, max_value=15.0),
+        condition=st.sampled_from(["晴天", "多云", "阴天", "雨天", "雪天", "雷暴", "雾霾"]),
+        season=st.sampled_from(list(Season))
+    )
+    @settings(max_examples=50)
+    def test_property_cached_results_are_independent(self, temperature, humidity, wind_speed,
+                                                     visibility, uv_index, condition, season):
+        """
+        属性：缓存结果一致且互不影响
+        
+        Repeated calls with the same weather should return equal results,
+        and mutating a returned list must not affect later calls.
+        """
+        recommender = ActivityRecommender()
+        weather = self._create_weather_data(
+            temperature=temperature,
+            humidity=humidity,
+            wind_speed=wind_speed,
+            visibility=visibility,
+            uv_index=uv_index,
+            condition=condition
+        )
+        
+        activities_1 = recommender.recommend_activities(weather, season)
+        safety_1 = recommender.get_safety_recommendations(weather)
+        expected_activities = list(activities_1)
+        expected_safety = list(safety_1)
+        
+        activities_1.clear()
+        safety_1.append("额外建议")
+        
+        assert recommender.recommend_activities(weather, season) == expected_activities
+        assert recommender.get_safety_recommendations(weather) == expected_safety
+    
     @given(
         temperature=st.floats(min_value=-30.0, max_value=45.0),
         wind_speed=st.floats(min_value=0.0, max_value=40.0),
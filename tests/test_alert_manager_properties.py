@@ -31,10 +31,11 @@ class TestAlertManagerProperties:
         return manager, db_path
     
     def _cleanup_temp_db(self, db_path):
-        """清理临时数据库"""
+        """清理临时数据库（包括 WAL 模式的 -wal/-shm 文件）"""
         try:
-            if os.path.exists(db_path):
-                os.unlink(db_path)
+            for path in (db_path, db_path + '-wal', db_path + '-shm'):
+                if os.path.exists(path):
+                    os.unlink(path)
         except PermissionError:
             # Windows上SQLite文件可能被锁定，忽略删除错误
             pass
@@ -411,4 +412,64 @@ class TestAlertManagerProperties:
                 assert final_count <= initial_count
             
         finally:
+            self._cleanup_temp_db(db_path)
+    
+    def test_connection_pool_reuse(self):
+        """测试连接池复用空闲连接，关闭后仍可按需重新打开连接"""
+        alert_manager, db_path = self._create_temp_manager()
+        
+        try:
+            alert_manager.subscribe_user("pool_user", [AlertType.WIND])
+            
+            with alert_manager._conn() as conn:
+                first_conn = conn
+            with alert_manager._conn() as conn:
+                assert conn is first_conn
+            
+            alert_manager.close()
+            assert alert_manager.get_user_subscriptions("pool_user") == [AlertType.WIND]
+            
+        finally:
+            alert_manager.close()
+            self._cleanup_temp_db(db_path)
+    
+    def test_alert_suppression_expires_after_one_hour(self):
+        """测试抑制期过后同类型警报可以再次发送"""
+        alert_manager, db_path = self._create_temp_manager()
+        
+        try:
+            alert = self._create_test_weather_alert(AlertType.WIND, "test_location")
+            asyncio.run(alert_manager.send_alert("test_user", alert))
+            asyncio.run(alert_manager.send_alert("test_user", alert))
+            assert len(alert_manager.get_alert_history("test_user")) == 1
+            
+            # 把上次发送时间改到1小时之前
+            expired = (datetime.now() - timedelta(hours=1, seconds=1)).isoformat()
+            with alert_manager._conn() as conn:
+                conn.execute('UPDATE alert_suppression SET last_sent = ?', (expired,))
+            
+            asyncio.run(alert_manager.send_alert("test_user", alert))
+            assert len(alert_manager.get_alert_history("test_user")) == 2
+            
+        finally:
+            alert_manager.close()
+            self._cleanup_temp_db(db_path)
+    
+    def test_create_weather_alert_uses_given_timestamp(self):
+        """测试批量创建警报时使用调用方传入的同一时间戳"""
+        alert_manager, db_path = self._create_temp_manager()
+        
+        try:
+            now = datetime(2024, 7, 1, 12, 0, 0)
+            weather_data = self._create_test_weather_data(wind_speed=20.0, uv_index=12.0)
+            
+            alerts = [
+                alert_manager.create_weather_alert(alert_type, "test_location", weather_data, now=now)
+                for alert_type in (AlertType.WIND, AlertType.UV_INDEX)
+            ]
+            
+            assert all(alert is not None and alert.start_time == now for alert in alerts)
+            
+        finally:
+            alert_manager.close()
             self._cleanup_temp_db(db_path)
\ No newline at end of file
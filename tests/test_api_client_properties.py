@@ -353,6 +353,33 @@ class TestAPIRateLimitProperties:
             assert client.check_rate_limit() is True
 
 
+class TestWeatherAPIClientResponseParsing:
+    """API 响应解析测试"""
+    
+    @pytest.mark.asyncio
+    async def test_malformed_json_raises_api_error(self):
+        """响应体不是合法 JSON 时应抛出 APIError"""
+        client = WeatherAPIClient(WeatherConfig(
+            api_provider="openweathermap",
+            api_key="test_key_12345678901234567890123456789012"
+        ))
+        
+        response = AsyncMock()
+        response.status = 200
+        response.read.return_value = b"<html>not json</html>"
+        
+        request_ctx = AsyncMock()
+        request_ctx.__aenter__.return_value = response
+        
+        session = AsyncMock()
+        session.closed = False
+        session.get = lambda *args, **kwargs: request_ctx
+        client.session = session
+        
+        with pytest.raises(APIError, match="响应解析失败"):
+            await client._make_request("weather", {"q": "北京"})
+
+
 # 运行属性测试的辅助函数
 def run_property_tests():
     """运行所有属性测试"""
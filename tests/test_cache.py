@@ -110,7 +110,6 @@ class TestCacheManager:
         
         assert key1 != key2
     
-    @pytest.mark.asyncio
     async def test_cache_weather_data(self, cache_manager, sample_weather_data):
         """测试缓存天气数据"""
         cache_key = cache_manager.generate_cache_key("北京", "weather")
@@ -125,7 +124,22 @@ class TestCacheManager:
         assert cached_data.location == sample_weather_data.location
         assert cached_data.temperature == sample_weather_data.temperature
     
-    @pytest.mark.asyncio
+    async def test_memory_cache_persists_between_calls(self, sample_weather_data):
+        """测试内存数据库在多次操作之间保留数据"""
+        config = WeatherConfig(api_key="test_key", cache_enabled=True, cache_db_path=":memory:")
+        cache_manager = CacheManager(config)
+        
+        try:
+            cache_key = cache_manager.generate_cache_key("北京", "weather")
+            await cache_manager.cache_weather_data(cache_key, sample_weather_data, 600)
+            
+            cached_data = await cache_manager.get_cached_weather(cache_key)
+            
+            assert cached_data is not None
+            assert cached_data.location == sample_weather_data.location
+        finally:
+            cache_manager.close()
+    
     async def test_cache_forecast_data(self, cache_manager, sample_forecast_data):
         """测试缓存预报数据"""
         cache_key = cache_manager.generate_cache_key("北京", "forecast")
@@ -140,7 +154,6 @@ class TestCacheManager:
         assert cached_data.location == sample_forecast_data.location
         assert len(cached_data.days) == len(sample_forecast_data.days)
     
-    @pytest.mark.asyncio
     async def test_cache_expiration(self, cache_manager, sample_weather_data):
         """测试缓存过期"""
         cache_key = cache_manager.generate_cache_key("北京", "weather")
@@ -275,5 +288,8 @@ class TestCacheManager:
             
             assert cached_data is None
             
+            # 禁用缓存时不应创建数据库文件
+            assert not os.path.exists(temp_config.cache_db_path)
+            
         finally:
             cache_manager.close()
\ No newline at end of file
@@ -19,6 +19,35 @@ from weather_plugin.config import WeatherConfig
 from weather_plugin.models import WeatherData, ForecastData, ForecastDay, CacheError
 
 
+# 策略中使用的固定时间点，避免每次抽样都读取系统时钟
+_EPOCH = datetime(2024, 1, 1)
+
+# 非空白位置字符串：首字符非空白，直接生成而不是过滤重试
+NONBLANK = st.from_regex(r'\S[^\x00]{0,49}', fullmatch=True)
+
+
+@st.composite
+def _forecast_day_strategy(draw):
+    """生成单日预报数据（日期由调用方按顺序填充）"""
+    low_temp = draw(st.floats(min_value=-50.0, max_value=40.0))
+    high_temp = draw(st.floats(min_value=low_temp, max_value=50.0))
+    condition = draw(st.text(min_size=1, max_size=100))
+    precipitation_chance = draw(st.integers(min_value=0, max_value=100))
+    wind_speed = draw(st.floats(min_value=0.0, max_value=200.0))
+    humidity = draw(st.integers(min_value=0, max_value=100))
+    
+    return ForecastDay(
+        date=_EPOCH.date(),
+        high_temp=high_temp,
+        low_temp=low_temp,
+        condition=condition,
+        precipitation_chance=precipitation_chance,
+        wind_speed=wind_speed,
+        humidity=humidity
+    )
+
+
+@pytest.mark.xdist_group("cache_props")
 class TestCacheManagerProperties:
     """缓存管理器属性测试"""
     
@@ -50,7 +79,7 @@ class TestCacheManagerProperties:
     @st.composite
     def valid_weather_data_strategy(draw):
         """生成有效的天气数据"""
-        location = draw(st.text(min_size=1, max_size=50).filter(lambda x: x.strip()))
+        location = draw(NONBLANK)
         temperature = draw(st.floats(min_value=-50.0, max_value=50.0))
         feels_like = draw(st.floats(min_value=-50.0, max_value=50.0))
         humidity = draw(st.integers(min_value=0, max_value=100))
@@ -75,48 +104,30 @@ class TestCacheManagerProperties:
             uv_index=uv_index,
             condition=condition,
             condition_code=condition_code,
-            timestamp=datetime.now(),
+            timestamp=_EPOCH,
             units=units
         )
     
     @st.composite
     def valid_forecast_data_strategy(draw):
         """生成有效的预报数据"""
-        location = draw(st.text(min_size=1, max_size=50).filter(lambda x: x.strip()))
+        location = draw(NONBLANK)
         units = draw(st.sampled_from(["metric", "imperial"]))
         
-        # 生成1-7天的预报数据
-        num_days = draw(st.integers(min_value=1, max_value=7))
-        days = []
-        
-        for i in range(num_days):
-            forecast_date = datetime.now().date() + timedelta(days=i)
-            low_temp = draw(st.floats(min_value=-50.0, max_value=40.0))
-            high_temp = draw(st.floats(min_value=low_temp, max_value=50.0))
-            condition = draw(st.text(min_size=1, max_size=100))
-            precipitation_chance = draw(st.integers(min_value=0, max_value=100))
-            wind_speed = draw(st.floats(min_value=0.0, max_value=200.0))
-            humidity = draw(st.integers(min_value=0, max_value=100))
-            
-            days.append(ForecastDay(
-                date=forecast_date,
-                high_temp=high_temp,
-                low_temp=low_temp,
-                condition=condition,
-                precipitation_chance=precipitation_chance,
-                wind_speed=wind_speed,
-                humidity=humidity
-            ))
+        # 生成1-7天的预报数据，日期按顺序依次递增
+        days = draw(st.lists(_forecast_day_strategy(), min_size=1, max_size=7))
+        for i, day in enumerate(days):
+            day.date = _EPOCH.date() + timedelta(days=i)
         
         return ForecastData(
             location=location,
             days=days,
             units=units,
-            generated_at=datetime.now()
+            generated_at=_EPOCH
         )
     
     @given(
-        location=st.text(min_size=1, max_size=50).filter(lambda x: x.strip()),
+        location=NONBLANK,
         data_type=st.sampled_from(['weather', 'forecast', 'hourly']),
         units=st.sampled_from(['metric', 'imperial'])
     )
@@ -181,18 +192,7 @@ class TestCacheManagerProperties:
                 
                 # 验证数据一致性
                 assert cached_data is not None, "应该能够获取缓存的数据"
-                assert cached_data.location == weather_data.location
-                assert cached_data.temperature == weather_data.temperature
-                assert cached_data.feels_like == weather_data.feels_like
-                assert cached_data.humidity == weather_data.humidity
-                assert cached_data.wind_speed == weather_data.wind_speed
-                assert cached_data.wind_direction == weather_data.wind_direction
-                assert cached_data.pressure == weather_data.pressure
-                assert cached_data.visibility == weather_data.visibility
-                assert cached_data.uv_index == weather_data.uv_index
-                assert cached_data.condition == weather_data.condition
-                assert cached_data.condition_code == weather_data.condition_code
-                assert cached_data.units == weather_data.units
+                assert cached_data == weather_data
             
             asyncio.run(run_test())
             
@@ -229,19 +229,7 @@ class TestCacheManagerProperties:
                 
                 # 验证数据一致性
                 assert cached_data is not None, "应该能够获取缓存的预报数据"
-                assert cached_data.location == forecast_data.location
-                assert cached_data.units == forecast_data.units
-                assert len(cached_data.days) == len(forecast_data.days)
-                
-                # 验证每日数据
-                for original_day, cached_day in zip(forecast_data.days, cached_data.days):
-                    assert cached_day.date == original_day.date
-                    assert cached_day.high_temp == original_day.high_temp
-                    assert cached_day.low_temp == original_day.low_temp
-                    assert cached_day.condition == original_day.condition
-                    assert cached_day.precipitation_chance == original_day.precipitation_chance
-                    assert cached_day.wind_speed == original_day.wind_speed
-                    assert cached_day.humidity == original_day.humidity
+                assert cached_data == forecast_data
             
             asyncio.run(run_test())
             
@@ -294,8 +282,10 @@ class TestCacheManagerProperties:
     
     @given(
         locations=st.lists(
-            st.text(min_size=1, max_size=50).filter(lambda x: x.strip()),
-            min_size=2, max_size=5, unique=True
+            NONBLANK,
+            min_size=2, max_size=5,
+            # 缓存键会对位置做大小写和空白标准化，按标准化后的名称去重
+            unique_by=lambda loc: loc.lower().strip().replace(' ', '_')
         ),
         data_type=st.sampled_from(['weather', 'forecast']),
         units=st.sampled_from(['metric', 'imperial'])
@@ -363,7 +353,7 @@ class TestCacheManagerProperties:
             self._cleanup_temp_db(db_path)
     
     @given(
-        location=st.text(min_size=1, max_size=50).filter(lambda x: x.strip()),
+        location=NONBLANK,
         data_type=st.sampled_from(['weather', 'forecast']),
         units=st.sampled_from(['metric', 'imperial']),
         update_count=st.integers(min_value=2, max_value=5)
@@ -419,7 +409,7 @@ class TestCacheManagerProperties:
             self._cleanup_temp_db(db_path)
     
     @given(
-        location=st.text(min_size=1, max_size=50).filter(lambda x: x.strip()),
+        location=NONBLANK,
         units=st.sampled_from(['metric', 'imperial'])
     )
     @settings(max_examples=50)
@@ -466,14 +456,11 @@ class TestCacheManagerProperties:
         When caching is disabled, all cache operations should be no-ops and 
         retrieval should always return None.
         """
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
-            db_path = f.name
-        
-        # 创建禁用缓存的配置
+        # 创建禁用缓存的配置，无需数据库文件
         config = WeatherConfig(
             api_key="test_key",
             cache_enabled=False,  # 禁用缓存
-            cache_db_path=db_path,
+            cache_db_path=None,
             cache_ttl_current=600,
             cache_ttl_forecast=3600
         )
@@ -512,5 +499,4 @@ class TestCacheManagerProperties:
             asyncio.run(run_test())
             
         finally:
-            cache_manager.close()
-            self._cleanup_temp_db(db_path)
\ No newline at end of file
+            cache_manager.close()
\ No newline at end of file
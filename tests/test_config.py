@@ -3,14 +3,18 @@
 """
 
 import pytest
-import tempfile
-import os
+import string
 import yaml
-from hypothesis import given, strategies as st
+from hypothesis import given, settings, HealthCheck, strategies as st
 from weather_plugin.config import WeatherConfig, ConfigManager, APIProviderConfig
 from weather_plugin.models import ConfigurationError
 
 
+# API 密钥在实际中均为可打印 ASCII 字符，无需生成任意 Unicode 文本
+API_KEY = st.text(alphabet=string.printable.strip(), min_size=1, max_size=100)
+
+
+@pytest.mark.xdist_group("config")
 class TestWeatherConfig:
     """天气配置测试"""
     
@@ -22,6 +26,19 @@ class TestWeatherConfig:
         assert config.cache_enabled is True
         assert config.default_units == "metric"
     
+    def test_default_providers_not_shared(self):
+        """测试各实例的默认提供商配置互不影响"""
+        config1 = WeatherConfig(api_key="test_key")
+        config2 = WeatherConfig(api_key="test_key")
+        
+        config1.supported_providers["openweathermap"].rate_limits["per_minute"] = 1
+        config1.supported_providers["openweathermap"].supported_features.append("history")
+        
+        provider = config2.supported_providers["openweathermap"]
+        assert provider.rate_limits["per_minute"] == 60
+        assert "history" not in provider.supported_features
+        assert WeatherConfig(api_key="test_key").supported_providers["openweathermap"].rate_limits["per_minute"] == 60
+    
     def test_config_validation_success(self):
         """测试配置验证成功"""
         config = WeatherConfig(
@@ -50,6 +67,15 @@ class TestWeatherConfig:
         with pytest.raises(ConfigurationError, match="无效的默认单位"):
             config.validate()
     
+    def test_config_validation_missing_cache_db_path(self):
+        """测试启用缓存但未指定数据库路径"""
+        config = WeatherConfig(api_key="test_key", cache_db_path=None)
+        with pytest.raises(ConfigurationError, match="缓存数据库路径"):
+            config.validate()
+        
+        # 禁用缓存时允许不指定数据库路径
+        WeatherConfig(api_key="test_key", cache_enabled=False, cache_db_path=None).validate()
+    
     def test_config_validation_invalid_ttl(self):
         """测试无效 TTL"""
         config = WeatherConfig(api_key="test_key", cache_ttl_current=0)
@@ -57,6 +83,7 @@ class TestWeatherConfig:
             config.validate()
 
 
+@pytest.mark.xdist_group("config")
 class TestConfigManager:
     """配置管理器测试"""
     
@@ -77,34 +104,26 @@ class TestConfigManager:
         with pytest.raises(ConfigurationError, match="加载配置失败"):
             manager.load_config()
     
-    def test_save_and_load_config(self):
+    def test_save_and_load_config(self, tmp_path):
         """测试保存和加载配置"""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            temp_path = f.name
-        
-        try:
-            manager = ConfigManager(temp_path)
-            
-            # 创建配置
-            config = WeatherConfig(
-                api_key="test_key",
-                api_provider="weatherapi",
-                default_units="imperial"
-            )
-            
-            # 保存配置
-            manager.save_config(config)
-            
-            # 重新加载
-            loaded_config = manager.load_config()
-            
-            assert loaded_config.api_key == "test_key"
-            assert loaded_config.api_provider == "weatherapi"
-            assert loaded_config.default_units == "imperial"
-            
-        finally:
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        manager = ConfigManager(str(tmp_path / "cfg.yaml"))
+        
+        # 创建配置
+        config = WeatherConfig(
+            api_key="test_key",
+            api_provider="weatherapi",
+            default_units="imperial"
+        )
+        
+        # 保存配置
+        manager.save_config(config)
+        
+        # 重新加载
+        loaded_config = manager.load_config()
+        
+        assert loaded_config.api_key == "test_key"
+        assert loaded_config.api_provider == "weatherapi"
+        assert loaded_config.default_units == "imperial"
     
     def test_reload_config(self, temp_config_file):
         """测试重新加载配置"""
@@ -138,11 +157,12 @@ class TestConfigManager:
         assert config1 is config2  # 应该是同一个对象
 
 
+@pytest.mark.xdist_group("config_props")
 class TestConfigManagerPropertyBased:
     """配置管理器基于属性的测试"""
     
     @given(
-        api_key=st.text(min_size=1, max_size=100),
+        api_key=API_KEY,
         api_provider=st.sampled_from(["openweathermap", "weatherapi"]),
         cache_enabled=st.booleans(),
         default_units=st.sampled_from(["metric", "imperial"]),
@@ -195,7 +215,7 @@ class TestConfigManagerPropertyBased:
         assert config.cache_ttl_hourly == cache_ttl_hourly
     
     @given(
-        api_key=st.text(min_size=1, max_size=50),
+        api_key=API_KEY,
         api_provider=st.sampled_from(["openweathermap", "weatherapi"]),
         cache_enabled=st.booleans(),
         default_units=st.sampled_from(["metric", "imperial"]),
@@ -203,8 +223,9 @@ class TestConfigManagerPropertyBased:
         cache_ttl_forecast=st.integers(min_value=1, max_value=86400),
         cache_ttl_hourly=st.integers(min_value=1, max_value=86400),
     )
+    @settings(suppress_health_check=[HealthCheck.function_scoped_fixture])
     def test_config_save_load_roundtrip_property(
-        self, api_key, api_provider, cache_enabled, default_units,
+        self, tmp_path, api_key, api_provider, cache_enabled, default_units,
         cache_ttl_current, cache_ttl_forecast, cache_ttl_hourly
     ):
         """
@@ -222,32 +243,24 @@ class TestConfigManagerPropertyBased:
             'cache_ttl_hourly': cache_ttl_hourly,
         }
         
-        # 创建临时文件
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            temp_path = f.name
-        
-        try:
-            manager = ConfigManager(temp_path)
-            
-            # 创建配置对象
-            original_config = WeatherConfig(**config_data)
-            original_config.validate()
-            
-            # 保存配置
-            manager.save_config(original_config)
-            
-            # 重新加载配置
-            loaded_config = manager.load_config()
-            
-            # 验证关键字段一致
-            assert loaded_config.api_key == original_config.api_key
-            assert loaded_config.api_provider == original_config.api_provider
-            assert loaded_config.cache_enabled == original_config.cache_enabled
-            assert loaded_config.default_units == original_config.default_units
-            assert loaded_config.cache_ttl_current == original_config.cache_ttl_current
-            assert loaded_config.cache_ttl_forecast == original_config.cache_ttl_forecast
-            assert loaded_config.cache_ttl_hourly == original_config.cache_ttl_hourly
-            
-        finally:
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
\ No newline at end of file
+        # tmp_path 由 pytest 自动清理；每个示例保存时都会覆盖同一文件
+        manager = ConfigManager(str(tmp_path / "cfg.yaml"))
+        
+        # 创建配置对象
+        original_config = WeatherConfig(**config_data)
+        original_config.validate()
+        
+        # 保存配置
+        manager.save_config(original_config)
+        
+        # 重新加载配置
+        loaded_config = manager.load_config()
+        
+        # 验证关键字段一致
+        assert loaded_config.api_key == original_config.api_key
+        assert loaded_config.api_provider == original_config.api_provider
+        assert loaded_config.cache_enabled == original_config.cache_enabled
+        assert loaded_config.default_units == original_config.default_units
+        assert loaded_config.cache_ttl_current == original_config.cache_ttl_current
+        assert loaded_config.cache_ttl_forecast == original_config.cache_ttl_forecast
+        assert loaded_config.cache_ttl_hourly == original_config.cache_ttl_hourly
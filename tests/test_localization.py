@@ -5,147 +5,130 @@
 """
 
 import pytest
-import tempfile
-import os
 from weather_plugin.localization import LocalizationManager
 from weather_plugin.models import ConfigurationError
 
 
+@pytest.fixture(scope="module")
+def default_manager():
+    """使用默认本地化目录的管理器（模块内共享，只解析一次 YAML）"""
+    return LocalizationManager()
+
+
+@pytest.fixture(autouse=True)
+def _restore_lang(default_manager):
+    """测试结束后恢复共享管理器的当前语言"""
+    lang = default_manager.get_current_language()
+    yield
+    default_manager.set_language(lang)
+
+
 class TestLocalizationManager:
     """本地化管理器测试"""
     
-    def test_init_with_default_locales_dir(self):
+    def test_init_with_default_locales_dir(self, default_manager):
         """测试使用默认本地化目录初始化"""
-        manager = LocalizationManager()
-        assert manager.locales_dir is not None
-        assert manager.get_current_language() == 'zh'
+        assert default_manager.locales_dir is not None
+        assert default_manager.get_current_language() == 'zh'
     
-    def test_init_with_custom_locales_dir(self):
+    def test_init_with_custom_locales_dir(self, tmp_path):
         """测试使用自定义本地化目录初始化"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            manager = LocalizationManager(temp_dir)
-            assert manager.locales_dir == temp_dir
+        manager = LocalizationManager(str(tmp_path))
+        assert manager.locales_dir == str(tmp_path)
     
-    def test_set_language_valid(self):
+    def test_set_language_valid(self, default_manager):
         """测试设置有效语言"""
-        manager = LocalizationManager()
-        available_languages = manager.get_available_languages()
+        available_languages = default_manager.get_available_languages()
         
         if 'en' in available_languages:
-            manager.set_language('en')
-            assert manager.get_current_language() == 'en'
+            default_manager.set_language('en')
+            assert default_manager.get_current_language() == 'en'
     
-    def test_set_language_invalid(self):
+    def test_set_language_invalid(self, default_manager):
         """测试设置无效语言"""
-        manager = LocalizationManager()
-        
         with pytest.raises(ConfigurationError):
-            manager.set_language('invalid_lang')
+            default_manager.set_language('invalid_lang')
     
-    def test_get_available_languages(self):
+    def test_get_available_languages(self, default_manager):
         """测试获取可用语言列表"""
-        manager = LocalizationManager()
-        languages = manager.get_available_languages()
+        languages = default_manager.get_available_languages()
         
         assert isinstance(languages, list)
         # 应该至少有中文
         assert 'zh' in languages or len(languages) == 0  # 如果没有本地化文件
     
-    def test_get_text_existing_key(self):
+    def test_get_text_existing_key(self, default_manager):
         """测试获取存在的文本键"""
-        manager = LocalizationManager()
-        
         # 测试简单键
-        text = manager.get_text('metadata.name')
+        text = default_manager.get_text('metadata.name')
         assert isinstance(text, str)
         assert text != 'metadata.name'  # 应该返回实际文本而不是键名
     
-    def test_get_text_nonexistent_key(self):
+    def test_get_text_nonexistent_key(self, default_manager):
         """测试获取不存在的文本键"""
-        manager = LocalizationManager()
-        
-        text = manager.get_text('nonexistent.key')
+        text = default_manager.get_text('nonexistent.key')
         assert text == 'nonexistent.key'  # 应该返回键名
     
-    def test_get_text_with_formatting(self):
+    def test_get_text_with_formatting(self, default_manager):
         """测试带格式化参数的文本获取"""
-        manager = LocalizationManager()
-        
         # 测试格式化
-        text = manager.get_text('messages.status.querying_weather', location='北京')
+        text = default_manager.get_text('messages.status.querying_weather', location='北京')
         assert isinstance(text, str)
         assert '北京' in text or 'Beijing' in text or 'querying_weather' in text
     
-    def test_get_metadata(self):
+    def test_get_metadata(self, default_manager):
         """测试获取元数据本地化"""
-        manager = LocalizationManager()
-        
-        metadata = manager.get_metadata()
+        metadata = default_manager.get_metadata()
         assert isinstance(metadata, dict)
     
-    def test_get_command_info(self):
+    def test_get_command_info(self, default_manager):
         """测试获取命令信息本地化"""
-        manager = LocalizationManager()
-        
-        command_info = manager.get_command_info('weather')
+        command_info = default_manager.get_command_info('weather')
         assert isinstance(command_info, dict)
     
-    def test_format_message(self):
+    def test_format_message(self, default_manager):
         """测试格式化消息"""
-        manager = LocalizationManager()
-        
-        message = manager.format_message('help')
+        message = default_manager.format_message('help')
         assert isinstance(message, str)
     
-    def test_format_error(self):
+    def test_format_error(self, default_manager):
         """测试格式化错误消息"""
-        manager = LocalizationManager()
-        
-        error = manager.format_error('config_error', error='test error')
+        error = default_manager.format_error('config_error', error='test error')
         assert isinstance(error, str)
     
-    def test_format_status(self):
+    def test_format_status(self, default_manager):
         """测试格式化状态消息"""
-        manager = LocalizationManager()
-        
-        status = manager.format_status('config_reloaded')
+        status = default_manager.format_status('config_reloaded')
         assert isinstance(status, str)
     
-    def test_format_prompt(self):
+    def test_format_prompt(self, default_manager):
         """测试格式化提示消息"""
-        manager = LocalizationManager()
-        
-        prompt = manager.format_prompt('ask_location')
+        prompt = default_manager.format_prompt('ask_location')
         assert isinstance(prompt, str)
     
-    def test_language_fallback(self):
+    def test_language_fallback(self, default_manager):
         """测试语言回退机制"""
-        manager = LocalizationManager()
-        
         # 如果有英文本地化，测试回退
-        if 'en' in manager.get_available_languages():
-            manager.set_language('en')
+        if 'en' in default_manager.get_available_languages():
+            default_manager.set_language('en')
             
             # 获取一个可能只在中文中存在的键
-            text = manager.get_text('some.nonexistent.key')
+            text = default_manager.get_text('some.nonexistent.key')
             assert isinstance(text, str)
 
 
 class TestLocalizationIntegration:
     """本地化集成测试"""
     
-    def test_localization_files_exist(self):
+    def test_localization_files_exist(self, default_manager):
         """测试本地化文件存在"""
-        manager = LocalizationManager()
-        languages = manager.get_available_languages()
+        languages = default_manager.get_available_languages()
         
         # 应该至少有一种语言
         assert len(languages) > 0
     
-    def test_required_keys_exist(self):
+    def test_required_keys_exist(self, default_manager):
         """测试必需的键存在"""
-        manager = LocalizationManager()
-        
         required_keys = [
             'metadata.name',
             'metadata.description',
@@ -155,7 +138,7 @@ class TestLocalizationIntegration:
         ]
         
         for key in required_keys:
-            text = manager.get_text(key)
+            text = default_manager.get_text(key)
             # 如果返回键名本身，说明键不存在
             if text == key:
                 # 这是可以接受的，因为可能没有本地化文件
@@ -163,10 +146,9 @@ class TestLocalizationIntegration:
             assert isinstance(text, str)
             assert len(text) > 0
     
-    def test_consistency_across_languages(self):
+    def test_consistency_across_languages(self, default_manager):
         """测试不同语言间的一致性"""
-        manager = LocalizationManager()
-        languages = manager.get_available_languages()
+        languages = default_manager.get_available_languages()
         
         if len(languages) < 2:
             pytest.skip("需要至少两种语言进行一致性测试")
@@ -179,7 +161,7 @@ class TestLocalizationIntegration:
         for key in test_keys:
             texts = {}
             for lang in languages:
-                text = manager.get_text(key, language=lang)
+                text = default_manager.get_text(key, language=lang)
                 texts[lang] = text
             
             # 所有语言都应该有这个键的翻译
@@ -188,12 +170,13 @@ class TestLocalizationIntegration:
                 assert len(text) > 0, f"语言 {lang} 的键 {key} 翻译为空"
 
 
-@pytest.fixture
-def temp_localization_manager():
-    """创建临时本地化管理器用于测试"""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # 创建测试本地化文件
-        zh_content = """
+@pytest.fixture(scope="class")
+def temp_localization_manager(tmp_path_factory):
+    """创建临时本地化管理器用于测试（每个测试类只写入和解析一次）"""
+    base = tmp_path_factory.mktemp("i18n")
+    
+    # 创建测试本地化文件
+    zh_content = """
 metadata:
   name: "测试天气助手"
   description: "测试描述"
@@ -204,9 +187,9 @@ messages:
     config_error: "配置错误: {error}"
   status:
     config_reloaded: "配置重新加载成功"
-        """
-        
-        en_content = """
+    """
+    
+    en_content = """
 metadata:
   name: "Test Weather Assistant"
   description: "Test description"
@@ -217,21 +200,24 @@ messages:
     config_error: "Configuration error: {error}"
   status:
     config_reloaded: "Configuration reloaded successfully"
-        """
-        
-        # 写入测试文件
-        with open(os.path.join(temp_dir, 'zh.yaml'), 'w', encoding='utf-8') as f:
-            f.write(zh_content)
-        
-        with open(os.path.join(temp_dir, 'en.yaml'), 'w', encoding='utf-8') as f:
-            f.write(en_content)
-        
-        yield LocalizationManager(temp_dir)
+    """
+    
+    # 写入测试文件
+    base.joinpath('zh.yaml').write_text(zh_content, encoding='utf-8')
+    base.joinpath('en.yaml').write_text(en_content, encoding='utf-8')
+    
+    yield LocalizationManager(str(base))
 
 
 class TestLocalizationWithTestData:
     """使用测试数据的本地化测试"""
     
+    @pytest.fixture(autouse=True)
+    def _reset_language(self, temp_localization_manager):
+        """共享的管理器在每个测试前恢复为默认语言"""
+        temp_localization_manager.set_language('zh')
+        yield
+    
     def test_basic_functionality(self, temp_localization_manager):
         """测试基本功能"""
         manager = temp_localization_manager
@@ -276,16 +262,14 @@ class TestLocalizationWithTestData:
 class TestMetadataLocalization:
     """元数据本地化测试"""
     
-    def test_get_localized_metadata_from_file(self):
+    def test_get_localized_metadata_from_file(self, default_manager):
         """测试从文件获取本地化元数据"""
-        manager = LocalizationManager()
-        
         # 测试获取中文元数据
-        metadata_zh = manager.get_localized_metadata_from_file('metadata.yaml', 'zh')
+        metadata_zh = default_manager.get_localized_metadata_from_file('metadata.yaml', 'zh')
         assert isinstance(metadata_zh, dict)
         
         # 测试获取英文元数据
-        metadata_en = manager.get_localized_metadata_from_file('metadata.yaml', 'en')
+        metadata_en = default_manager.get_localized_metadata_from_file('metadata.yaml', 'en')
         assert isinstance(metadata_en, dict)
         
         # 如果有本地化信息，应该不同
@@ -294,37 +278,31 @@ class TestMetadataLocalization:
             if 'name' in metadata_zh and 'name' in metadata_en:
                 assert metadata_zh['name'] != metadata_en['name']
     
-    def test_get_localized_command_info_from_file(self):
+    def test_get_localized_command_info_from_file(self, default_manager):
         """测试从文件获取本地化命令信息"""
-        manager = LocalizationManager()
-        
         # 测试获取天气命令的中文信息
-        command_zh = manager.get_localized_command_info_from_file('metadata.yaml', 'weather', 'zh')
+        command_zh = default_manager.get_localized_command_info_from_file('metadata.yaml', 'weather', 'zh')
         assert isinstance(command_zh, dict)
         
         # 测试获取天气命令的英文信息
-        command_en = manager.get_localized_command_info_from_file('metadata.yaml', 'weather', 'en')
+        command_en = default_manager.get_localized_command_info_from_file('metadata.yaml', 'weather', 'en')
         assert isinstance(command_en, dict)
         
         # 测试不存在的命令
-        nonexistent = manager.get_localized_command_info_from_file('metadata.yaml', 'nonexistent', 'zh')
+        nonexistent = default_manager.get_localized_command_info_from_file('metadata.yaml', 'nonexistent', 'zh')
         assert nonexistent == {}
     
-    def test_metadata_file_fallback(self):
+    def test_metadata_file_fallback(self, default_manager):
         """测试元数据文件回退机制"""
-        manager = LocalizationManager()
-        
         # 测试不存在的语言，应该回退到中文或默认值
-        metadata = manager.get_localized_metadata_from_file('metadata.yaml', 'nonexistent_lang')
+        metadata = default_manager.get_localized_metadata_from_file('metadata.yaml', 'nonexistent_lang')
         assert isinstance(metadata, dict)
     
-    def test_nonexistent_metadata_file(self):
+    def test_nonexistent_metadata_file(self, default_manager):
         """测试不存在的元数据文件"""
-        manager = LocalizationManager()
-        
         # 测试不存在的文件
-        metadata = manager.get_localized_metadata_from_file('nonexistent.yaml', 'zh')
+        metadata = default_manager.get_localized_metadata_from_file('nonexistent.yaml', 'zh')
         assert metadata == {}
         
-        command = manager.get_localized_command_info_from_file('nonexistent.yaml', 'weather', 'zh')
+        command = default_manager.get_localized_command_info_from_file('nonexistent.yaml', 'weather', 'zh')
         assert command == {}
\ No newline at end of file
@@ -8,10 +8,58 @@ from datetime import datetime, date
 from weather_plugin.models import (
     WeatherData, ForecastDay, ForecastData, UserPrefs, 
     WeatherCommand, Coordinates, LocationInfo,
-    CommandType, AlertType
+    CommandType, AlertType, Activity, WeatherCategory
 )
 
 
+@pytest.fixture(scope="module")
+def sample_weather() -> WeatherData:
+    """序列化测试共用的天气数据"""
+    return WeatherData(
+        location="北京", temperature=25.0, feels_like=27.0,
+        humidity=60, wind_speed=5.0, wind_direction=180,
+        pressure=1013.25, visibility=10.0, uv_index=5.0,
+        condition="晴天", condition_code="clear",
+        timestamp=datetime(2024, 1, 1, 12, 0, 0), units="metric"
+    )
+
+
+@pytest.fixture(scope="module")
+def sample_forecast_day() -> ForecastDay:
+    """序列化测试共用的预报日"""
+    return ForecastDay(
+        date=date(2024, 1, 1),
+        high_temp=30.0,
+        low_temp=20.0,
+        condition="晴天",
+        precipitation_chance=10,
+        wind_speed=5.0,
+        humidity=60
+    )
+
+
+@pytest.fixture(scope="module")
+def sample_forecast_data(sample_forecast_day) -> ForecastData:
+    """序列化测试共用的预报数据"""
+    return ForecastData(
+        location="北京",
+        days=[sample_forecast_day],
+        units="metric",
+        generated_at=datetime(2024, 1, 1, 6, 0, 0)
+    )
+
+
+@pytest.fixture(scope="module")
+def sample_user_prefs() -> UserPrefs:
+    """序列化测试共用的用户偏好"""
+    return UserPrefs(
+        user_id="test_user",
+        default_location="北京",
+        units="imperial",
+        alert_subscriptions=[AlertType.SEVERE_WEATHER],
+        language="en"
+    )
+
 class TestCoordinates:
     """坐标测试"""
     
@@ -82,32 +130,6 @@ class TestWeatherData:
                 condition="晴天", condition_code="clear",
                 timestamp=datetime.now(), units="metric"
             )
-    
-    def test_serialization(self):
-        """测试序列化和反序列化"""
-        timestamp = datetime(2024, 1, 1, 12, 0, 0)
-        weather = WeatherData(
-            location="北京", temperature=25.0, feels_like=27.0,
-            humidity=60, wind_speed=5.0, wind_direction=180,
-            pressure=1013.25, visibility=10.0, uv_index=5.0,
-            condition="晴天", condition_code="clear",
-            timestamp=timestamp, units="metric"
-        )
-        
-        # 测试 to_dict
-        data_dict = weather.to_dict()
-        assert data_dict['location'] == "北京"
-        assert data_dict['timestamp'] == timestamp.isoformat()
-        
-        # 测试 from_dict
-        restored_weather = WeatherData.from_dict(data_dict)
-        assert restored_weather.location == weather.location
-        assert restored_weather.timestamp == weather.timestamp
-        
-        # 测试 to_json
-        json_str = weather.to_json()
-        parsed_json = json.loads(json_str)
-        assert parsed_json['location'] == "北京"
 
 
 class TestForecastDay:
@@ -139,29 +161,6 @@ class TestForecastDay:
                 wind_speed=5.0,
                 humidity=60
             )
-    
-    def test_serialization(self):
-        """测试序列化和反序列化"""
-        test_date = date(2024, 1, 1)
-        forecast_day = ForecastDay(
-            date=test_date,
-            high_temp=30.0,
-            low_temp=20.0,
-            condition="晴天",
-            precipitation_chance=10,
-            wind_speed=5.0,
-            humidity=60
-        )
-        
-        # 测试 to_dict
-        data_dict = forecast_day.to_dict()
-        assert data_dict['date'] == test_date.isoformat()
-        assert data_dict['high_temp'] == 30.0
-        
-        # 测试 from_dict
-        restored_day = ForecastDay.from_dict(data_dict)
-        assert restored_day.date == forecast_day.date
-        assert restored_day.high_temp == forecast_day.high_temp
 
 
 class TestUserPrefs:
@@ -194,44 +193,19 @@ class TestUserPrefs:
         assert prefs.units == "imperial"
         assert AlertType.SEVERE_WEATHER in prefs.alert_subscriptions
     
-    def test_serialization(self):
-        """测试序列化和反序列化"""
-        prefs = UserPrefs(
-            user_id="test_user",
-            default_location="北京",
-            units="imperial",
-            alert_subscriptions=[AlertType.SEVERE_WEATHER],
-            language="en"
-        )
-        
-        # 测试 to_dict
-        data_dict = prefs.to_dict()
-        assert data_dict['user_id'] == "test_user"
-        assert data_dict['alert_subscriptions'] == ['severe']
-        
-        # 测试 from_dict
-        restored_prefs = UserPrefs.from_dict(data_dict)
-        assert restored_prefs.user_id == prefs.user_id
-        assert restored_prefs.alert_subscriptions == prefs.alert_subscriptions
-        
-        # 测试 to_json
-        json_str = prefs.to_json()
-        parsed_json = json.loads(json_str)
-        assert parsed_json['user_id'] == "test_user"
-    
-    def test_preference_updates(self):
+
+    def test_preference_updates(self, fake_clock):
         """测试偏好更新方法"""
-        import time
         prefs = UserPrefs(user_id="test_user")
         original_updated_at = prefs.updated_at
         
-        # 添加小延迟确保时间戳不同
-        time.sleep(0.001)
+        # 推进假时钟确保时间戳不同
+        fake_clock.advance(1e-6)
         
         # 测试位置更新
         prefs.update_location("上海")
         assert prefs.default_location == "上海"
-        assert prefs.updated_at >= original_updated_at
+        assert prefs.updated_at > original_updated_at
         
         # 测试单位更新
         prefs.update_units("imperial")
@@ -269,44 +243,61 @@ class TestWeatherCommand:
         assert command.additional_params["days"] == 7
 
 
-class TestForecastData:
-    """预报数据测试"""
+class TestActivity:
+    """活动模型测试"""
     
-    def test_serialization(self):
-        """测试预报数据序列化和反序列化"""
-        test_date = date(2024, 1, 1)
-        generated_at = datetime(2024, 1, 1, 12, 0, 0)
-        
-        forecast_day = ForecastDay(
-            date=test_date,
-            high_temp=30.0,
-            low_temp=20.0,
-            condition="晴天",
-            precipitation_chance=10,
-            wind_speed=5.0,
-            humidity=60
+    def test_activity_is_frozen_and_hashable(self):
+        """测试活动不可变且可哈希，字段被规范化为不可变类型"""
+        activity = Activity(
+            name="跑步",
+            description="户外慢跑",
+            category="运动",
+            suitable_weather=[WeatherCategory.SUNNY, WeatherCategory.SUNNY],
+            safety_notes=["注意防晒"]
         )
+        assert activity.suitable_weather == frozenset({WeatherCategory.SUNNY})
+        assert activity.safety_notes == ("注意防晒",)
+        assert len({activity, activity}) == 1
         
-        forecast_data = ForecastData(
-            location="北京",
-            days=[forecast_day],
-            units="metric",
-            generated_at=generated_at
+        with pytest.raises(AttributeError):
+            activity.name = "骑行"
+    
+    def test_activity_accepts_weather_labels(self):
+        """测试适宜天气可使用中文标签，并规范化为枚举成员"""
+        activity = Activity(
+            name="跑步",
+            description="户外慢跑",
+            category="运动",
+            suitable_weather=["晴天", WeatherCategory.PARTLY_CLOUDY]
         )
+        assert activity.suitable_weather == frozenset({
+            WeatherCategory.SUNNY, WeatherCategory.PARTLY_CLOUDY
+        })
+        
+        with pytest.raises(ValueError):
+            Activity(name="跑步", description="户外慢跑", category="运动", suitable_weather=["晴朗无云"])
+
+
+class TestSerialization:
+    """数据模型序列化往返测试"""
+    
+    @pytest.mark.parametrize("sample, expected_fields", [
+        ("sample_weather", {"location": "北京", "timestamp": "2024-01-01T12:00:00"}),
+        ("sample_forecast_day", {"date": "2024-01-01", "high_temp": 30.0}),
+        ("sample_forecast_data", {"location": "北京", "generated_at": "2024-01-01T06:00:00"}),
+        ("sample_user_prefs", {"user_id": "test_user", "alert_subscriptions": ["severe"]}),
+    ])
+    def test_roundtrip(self, request, sample, expected_fields):
+        """测试 to_dict / from_dict 往返以及 to_json 输出"""
+        obj = request.getfixturevalue(sample)
         
-        # 测试 to_dict
-        data_dict = forecast_data.to_dict()
-        assert data_dict['location'] == "北京"
-        assert len(data_dict['days']) == 1
-        assert data_dict['generated_at'] == generated_at.isoformat()
+        data_dict = obj.to_dict()
+        # 缓存和用户偏好以此格式写入 SQLite：日期为 ISO 字符串，枚举为其取值
+        for key, value in expected_fields.items():
+            assert data_dict[key] == value
+        assert json.loads(json.dumps(data_dict, ensure_ascii=False)) == data_dict
         
-        # 测试 from_dict
-        restored_forecast = ForecastData.from_dict(data_dict)
-        assert restored_forecast.location == forecast_data.location
-        assert len(restored_forecast.days) == 1
-        assert restored_forecast.generated_at == forecast_data.generated_at
+        assert type(obj).from_dict(data_dict) == obj
         
-        # 测试 to_json
-        json_str = forecast_data.to_json()
-        parsed_json = json.loads(json_str)
-        assert parsed_json['location'] == "北京"
\ No newline at end of file
+        if hasattr(obj, "to_json"):
+            assert json.loads(obj.to_json()) == data_dict
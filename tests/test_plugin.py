@@ -26,7 +26,6 @@ class TestWeatherPlugin:
         with pytest.raises(ConfigurationError):
             WeatherPlugin(invalid_config)
     
-    @pytest.mark.asyncio
     async def test_on_message_weather_related(self, weather_plugin, mock_message_event):
         """测试天气相关消息处理"""
         event = mock_message_event("今天天气怎么样？")
@@ -36,7 +35,6 @@ class TestWeatherPlugin:
         # 由于没有指定位置，系统会要求提供位置信息
         assert "位置" in response or "location" in response or "weather" in response
     
-    @pytest.mark.asyncio
     async def test_on_message_non_weather(self, weather_plugin, mock_message_event):
         """测试非天气相关消息"""
         event = mock_message_event("你好")
@@ -46,27 +44,23 @@ class TestWeatherPlugin:
         # 我们检查是否返回了合理的响应
         assert response is None or "位置" in response or "weather" in response
     
-    @pytest.mark.asyncio
     async def test_weather_command(self, weather_plugin):
         """测试天气命令"""
         response = await weather_plugin.on_command("weather", ["北京"], "test_user")
         # 由于使用测试API密钥，期望得到错误消息
         assert "weather_query_failed" in response or "API" in response or "天气" in response
     
-    @pytest.mark.asyncio
     async def test_weather_command_no_location(self, weather_plugin):
         """测试无位置的天气命令"""
         response = await weather_plugin.on_command("weather", [], "test_user")
         assert "请提供要查询的位置" in response
     
-    @pytest.mark.asyncio
     async def test_forecast_command(self, weather_plugin):
         """测试预报命令"""
         response = await weather_plugin.on_command("forecast", ["上海"], "test_user")
         # 由于使用测试API密钥，期望得到错误消息
         assert "forecast_query_failed" in response or "API" in response or "天气" in response
     
-    @pytest.mark.asyncio
     async def test_help_command(self, weather_plugin):
         """测试帮助命令"""
         response = await weather_plugin.on_command("help", [], "test_user")
@@ -74,7 +68,6 @@ class TestWeatherPlugin:
         assert "weather" in response
         assert "forecast" in response
     
-    @pytest.mark.asyncio
     async def test_unknown_command(self, weather_plugin):
         """测试未知命令"""
         response = await weather_plugin.on_command("unknown", [], "test_user")
@@ -3,10 +3,6 @@
 """
 
 import pytest
-import tempfile
-import os
-from pathlib import Path
-from datetime import datetime
 
 from weather_plugin.user_preferences import UserPreferences
 from weather_plugin.models import UserPrefs, AlertType
@@ -15,29 +11,10 @@ from weather_plugin.models import UserPrefs, AlertType
 class TestUserPreferences:
     """用户偏好管理测试"""
     
-    @pytest.fixture
-    def temp_db(self):
-        """创建临时数据库"""
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
-            db_path = f.name
-        yield db_path
-        # 清理 - 在Windows上可能需要多次尝试
-        try:
-            if os.path.exists(db_path):
-                os.unlink(db_path)
-        except PermissionError:
-            # Windows上SQLite文件可能被锁定，忽略删除错误
-            pass
-    
-    @pytest.fixture
-    def user_prefs_manager(self, temp_db):
-        """创建用户偏好管理器"""
-        return UserPreferences(temp_db)
-    
-    def test_init_database(self, user_prefs_manager):
+    def test_init_database(self, file_prefs_manager):
         """测试数据库初始化"""
         # 数据库文件应该存在
-        assert user_prefs_manager.db_path.exists()
+        assert file_prefs_manager.db_path.exists()
     
     def test_get_new_user_preferences(self, user_prefs_manager):
         """测试获取新用户偏好"""
@@ -151,24 +128,62 @@ class TestUserPreferences:
         for user_id in user_ids:
             assert user_id in all_users
     
-    def test_persistence(self, user_prefs_manager):
+    def test_persistence(self, file_prefs_manager):
         """测试数据持久化"""
         user_id = "test_user"
         location = "上海"
         
         # 设置偏好
-        user_prefs_manager.set_default_location(user_id, location)
-        user_prefs_manager.set_units(user_id, "imperial")
-        user_prefs_manager.add_alert_subscription(user_id, AlertType.SEVERE_WEATHER)
+        file_prefs_manager.set_default_location(user_id, location)
+        file_prefs_manager.set_units(user_id, "imperial")
+        file_prefs_manager.add_alert_subscription(user_id, AlertType.SEVERE_WEATHER)
         
         # 创建新的管理器实例（模拟重启）
-        new_manager = UserPreferences(user_prefs_manager.db_path)
+        new_manager = UserPreferences(file_prefs_manager.db_path)
         prefs = new_manager.get_user_preferences(user_id)
         
         assert prefs.default_location == location
         assert prefs.units == "imperial"
         assert AlertType.SEVERE_WEATHER in prefs.alert_subscriptions
     
+    def test_transaction(self, file_prefs_manager):
+        """测试事务内的多次写入统一提交，出错时整体回滚"""
+        user_id = "test_user"
+        
+        with file_prefs_manager.transaction():
+            file_prefs_manager.set_default_location(user_id, "北京")
+            file_prefs_manager.set_units(user_id, "imperial")
+        
+        prefs = UserPreferences(file_prefs_manager.db_path).get_user_preferences(user_id)
+        assert prefs.default_location == "北京"
+        assert prefs.units == "imperial"
+        
+        with pytest.raises(RuntimeError):
+            with file_prefs_manager.transaction():
+                file_prefs_manager.set_default_location(user_id, "上海")
+                raise RuntimeError("中断事务")
+        
+        prefs = file_prefs_manager.get_user_preferences(user_id)
+        assert prefs.default_location == "北京"
+    
+    def test_memory_transaction_rollback(self, user_prefs_manager):
+        """测试内存数据库的事务出错时整体回滚"""
+        user_id = "test_user"
+        
+        with user_prefs_manager.transaction():
+            user_prefs_manager.set_default_location(user_id, "北京")
+            user_prefs_manager.set_units(user_id, "imperial")
+        
+        with pytest.raises(RuntimeError):
+            with user_prefs_manager.transaction():
+                user_prefs_manager.set_default_location(user_id, "上海")
+                user_prefs_manager.set_units(user_id, "metric")
+                raise RuntimeError("中断事务")
+        
+        prefs = user_prefs_manager.get_user_preferences(user_id)
+        assert prefs.default_location == "北京"
+        assert prefs.units == "imperial"
+    
     def test_cleanup_database(self, user_prefs_manager):
         """测试数据库清理"""
         # 创建一些用户偏好
@@ -5,8 +5,7 @@
 """
 
 import pytest
-import tempfile
-import os
+from dataclasses import dataclass
 from pathlib import Path
 from hypothesis import given, strategies as st, assume, settings
 from hypothesis import HealthCheck
@@ -16,33 +15,85 @@ from weather_plugin.user_preferences import UserPreferences
 from weather_plugin.models import UserPrefs, AlertType
 
 
+# 直接从字母和数字中生成非空文本，无需再过滤空白字符串
+USER_ID = st.text(alphabet=st.characters(whitelist_categories=('Ll', 'Lu', 'Nd')), min_size=1, max_size=32)
+LOCATION = st.text(alphabet=st.characters(whitelist_categories=('L', 'N')), min_size=1, max_size=100)
+UNITS = st.sampled_from(['metric', 'imperial'])
+LANG = st.sampled_from(['zh', 'en'])
+
+# 警报类型在模块加载时枚举一次，供各策略复用
+_ALERT_TYPES = tuple(AlertType)
+_ALERT_N = len(_ALERT_TYPES)
+_ALERTS_STRAT = st.sampled_from(_ALERT_TYPES)
+
+# 属性4 使用的固定订阅及其期望集合，避免每个样例重复构造
+_P4_ALERTS = (AlertType.SEVERE_WEATHER, AlertType.TEMPERATURE_CHANGE)
+_P4_EXPECTED = frozenset(_P4_ALERTS)
+
+
+@dataclass
+class PrefsInput:
+    """属性4 的一次样例输入"""
+    user_id: str
+    location: str
+    units: str
+    language: str
+
+
+@dataclass
+class PrefsUpdateInput:
+    """属性5 的一次样例输入：初始偏好与更新后的偏好"""
+    user_id: str
+    initial_location: str
+    new_location: str
+    initial_units: str
+    new_units: str
+
+
+@st.composite
+def prefs_strategy(draw):
+    """将用户偏好的各字段合并为单个策略，每个样例只需一次抽取"""
+    return PrefsInput(draw(USER_ID), draw(LOCATION), draw(UNITS), draw(LANG))
+
+
+@st.composite
+def prefs_update_strategy(draw):
+    """生成偏好更新样例（初始值与新值）"""
+    return PrefsUpdateInput(
+        draw(USER_ID), draw(LOCATION), draw(LOCATION), draw(UNITS), draw(UNITS)
+    )
+
+
+@pytest.fixture(autouse=True)
+def _apply_test_pragmas(monkeypatch):
+    """测试中为新建连接启用 WAL 并关闭同步落盘，减少每次提交的 fsync 开销"""
+    open_connection = UserPreferences._open_connection
+    
+    def _open_with_pragmas(self, **kwargs):
+        conn = open_connection(self, **kwargs)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        return conn
+    
+    monkeypatch.setattr(UserPreferences, "_open_connection", _open_with_pragmas)
+
+
 class TestUserPreferencesProperties:
     """用户偏好管理属性测试"""
     
-    def _create_temp_manager(self):
-        """创建临时用户偏好管理器"""
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
-            db_path = f.name
-        manager = UserPreferences(db_path)
-        return manager, db_path
+    @pytest.fixture
+    def mgr(self):
+        """内存用户偏好管理器，在同一测试的所有 Hypothesis 样例间复用"""
+        return UserPreferences(":memory:")
     
-    def _cleanup_temp_db(self, db_path):
-        """清理临时数据库"""
-        try:
-            if os.path.exists(db_path):
-                os.unlink(db_path)
-        except PermissionError:
-            # Windows上SQLite文件可能被锁定，忽略删除错误
-            pass
+    def _create_temp_manager(self, tmp_path_factory, worker_id):
+        """创建基于临时文件的用户偏好管理器（目录由 pytest 自动清理，按 xdist 进程区分）"""
+        db_path = tmp_path_factory.mktemp(f"prefs-{worker_id}") / "u.db"
+        return UserPreferences(str(db_path)), db_path
     
-    @given(
-        user_id=st.text(min_size=1, max_size=50).filter(lambda x: x.strip()),
-        location=st.text(min_size=1, max_size=100).filter(lambda x: x.strip()),
-        units=st.sampled_from(['metric', 'imperial']),
-        language=st.sampled_from(['zh', 'en'])
-    )
+    @given(prefs=prefs_strategy())
     @settings(max_examples=100)
-    def test_property_4_user_preference_persistence(self, user_id, location, units, language):
+    def test_property_4_user_preference_persistence(self, tmp_path_factory, worker_id, prefs):
         """
         属性4：用户偏好持久化
         
@@ -51,53 +102,42 @@ class TestUserPreferencesProperties:
         For any valid user preferences, storing them and then retrieving them 
         should return equivalent preferences.
         """
-        user_prefs_manager, db_path = self._create_temp_manager()
+        user_id, location = prefs.user_id, prefs.location
+        units, language = prefs.units, prefs.language
+        user_prefs_manager, db_path = self._create_temp_manager(tmp_path_factory, worker_id)
         
-        try:
-            # 设置用户偏好
+        # 设置用户偏好（同一事务内提交）
+        with user_prefs_manager.transaction():
             user_prefs_manager.set_default_location(user_id, location)
             user_prefs_manager.set_units(user_id, units)
             user_prefs_manager.set_language(user_id, language)
-            
-            # 添加一些警报订阅
-            alert_types = [AlertType.SEVERE_WEATHER, AlertType.TEMPERATURE_CHANGE]
-            user_prefs_manager.update_alert_subscriptions(user_id, alert_types)
-            
-            # 获取偏好
-            retrieved_prefs = user_prefs_manager.get_user_preferences(user_id)
-            
-            # 验证持久化
-            assert retrieved_prefs.user_id == user_id
-            assert retrieved_prefs.default_location == location
-            assert retrieved_prefs.units == units
-            assert retrieved_prefs.language == language
-            assert set(retrieved_prefs.alert_subscriptions) == set(alert_types)
-            
-            # 创建新的管理器实例（模拟重启）
-            new_manager = UserPreferences(db_path)
-            persisted_prefs = new_manager.get_user_preferences(user_id)
-            
-            # 验证数据在重启后仍然存在
-            assert persisted_prefs.user_id == retrieved_prefs.user_id
-            assert persisted_prefs.default_location == retrieved_prefs.default_location
-            assert persisted_prefs.units == retrieved_prefs.units
-            assert persisted_prefs.language == retrieved_prefs.language
-            assert set(persisted_prefs.alert_subscriptions) == set(retrieved_prefs.alert_subscriptions)
-        
-        finally:
-            self._cleanup_temp_db(db_path)
+        
+        # 添加一些警报订阅
+        user_prefs_manager.update_alert_subscriptions(user_id, list(_P4_ALERTS))
+        
+        # 获取偏好
+        retrieved_prefs = user_prefs_manager.get_user_preferences(user_id)
+        
+        # 验证持久化
+        assert retrieved_prefs.user_id == user_id
+        assert retrieved_prefs.default_location == location
+        assert retrieved_prefs.units == units
+        assert retrieved_prefs.language == language
+        assert frozenset(retrieved_prefs.alert_subscriptions) == _P4_EXPECTED
+        
+        # 创建新的管理器实例（模拟重启）
+        new_manager = UserPreferences(db_path)
+        persisted_prefs = new_manager.get_user_preferences(user_id)
+        
+        # 验证数据在重启后仍然存在
+        assert persisted_prefs.user_id == retrieved_prefs.user_id
+        assert persisted_prefs.default_location == retrieved_prefs.default_location
+        assert persisted_prefs.units == retrieved_prefs.units
+        assert persisted_prefs.language == retrieved_prefs.language
+        assert frozenset(persisted_prefs.alert_subscriptions) == _P4_EXPECTED
     
-    @given(
-        user_id=st.text(min_size=1, max_size=50).filter(lambda x: x.strip()),
-        initial_location=st.text(min_size=1, max_size=100).filter(lambda x: x.strip()),
-        new_location=st.text(min_size=1, max_size=100).filter(lambda x: x.strip()),
-        initial_units=st.sampled_from(['metric', 'imperial']),
-        new_units=st.sampled_from(['metric', 'imperial'])
-    )
-    @settings(max_examples=100)
-    def test_property_5_preference_update_confirmation(self, user_id, 
-                                                     initial_location, new_location, 
-                                                     initial_units, new_units):
+    @given(update=prefs_update_strategy())
+    def test_property_5_preference_update_confirmation(self, mgr, fake_clock, update):
         """
         属性5：偏好更新确认
         
@@ -106,180 +146,156 @@ class TestUserPreferencesProperties:
         For any user preferences, updating a preference should result in the 
         updated value being retrievable and the updated_at timestamp being newer.
         """
-        user_prefs_manager, db_path = self._create_temp_manager()
+        # Hypothesis 在同一夹具实例上重复执行测试体，每个样例开始前清空数据
+        mgr.cleanup_database()
+        user_id = update.user_id
         
-        try:
-            # 设置初始偏好
-            user_prefs_manager.set_default_location(user_id, initial_location)
-            user_prefs_manager.set_units(user_id, initial_units)
-            
-            initial_prefs = user_prefs_manager.get_user_preferences(user_id)
-            initial_updated_at = initial_prefs.updated_at
-            
-            # 等待一小段时间确保时间戳不同
-            import time
-            time.sleep(0.001)
-            
-            # 更新位置
-            user_prefs_manager.set_default_location(user_id, new_location)
-            updated_prefs = user_prefs_manager.get_user_preferences(user_id)
-            
-            # 验证位置更新
-            assert updated_prefs.default_location == new_location
-            assert updated_prefs.updated_at >= initial_updated_at
-            
-            # 更新单位
-            user_prefs_manager.set_units(user_id, new_units)
-            final_prefs = user_prefs_manager.get_user_preferences(user_id)
-            
-            # 验证单位更新
-            assert final_prefs.units == new_units
-            assert final_prefs.updated_at >= updated_prefs.updated_at
-            
-            # 验证其他字段保持不变
-            assert final_prefs.user_id == user_id
-            assert final_prefs.default_location == new_location
+        # 设置初始偏好
+        mgr.set_default_location(user_id, update.initial_location)
+        mgr.set_units(user_id, update.initial_units)
         
-        finally:
-            self._cleanup_temp_db(db_path)
+        initial_prefs = mgr.get_user_preferences(user_id)
+        initial_updated_at = initial_prefs.updated_at
+        
+        # 推进假时钟确保时间戳不同
+        fake_clock.advance(1e-6)
+        
+        # 更新位置和单位，最后统一读取一次
+        mgr.set_default_location(user_id, update.new_location)
+        mgr.set_units(user_id, update.new_units)
+        final_prefs = mgr.get_user_preferences(user_id)
+        
+        # 验证更新结果
+        assert final_prefs.user_id == user_id
+        assert final_prefs.default_location == update.new_location
+        assert final_prefs.units == update.new_units
+        assert final_prefs.updated_at > initial_updated_at
     
     @given(
-        user_id=st.text(min_size=1, max_size=50).filter(lambda x: x.strip()),
+        user_id=USER_ID,
         alert_types_list=st.lists(
-            st.sampled_from(list(AlertType)), 
+            _ALERTS_STRAT, 
             min_size=0, 
-            max_size=len(AlertType), 
+            max_size=_ALERT_N, 
             unique=True
         )
     )
-    @settings(max_examples=100)
-    def test_property_alert_subscription_consistency(self, user_id, alert_types_list):
+    def test_property_alert_subscription_consistency(self, mgr, user_id, alert_types_list):
         """
         属性：警报订阅一致性
         
         For any list of alert types, setting them as subscriptions should result 
         in exactly those alert types being retrievable.
         """
-        user_prefs_manager, db_path = self._create_temp_manager()
+        # Hypothesis 在同一夹具实例上重复执行测试体，每个样例开始前清空数据
+        mgr.cleanup_database()
         
-        try:
-            # 设置警报订阅
-            user_prefs_manager.update_alert_subscriptions(user_id, alert_types_list)
-            
-            # 获取订阅
-            retrieved_subscriptions = user_prefs_manager.get_alert_subscriptions(user_id)
-            
-            # 验证一致性
-            assert set(retrieved_subscriptions) == set(alert_types_list)
-            assert len(retrieved_subscriptions) == len(alert_types_list)
+        # 设置警报订阅
+        mgr.update_alert_subscriptions(user_id, alert_types_list)
         
-        finally:
-            self._cleanup_temp_db(db_path)
+        # 获取订阅
+        retrieved_subscriptions = mgr.get_alert_subscriptions(user_id)
+        
+        # 验证一致性（期望集合每个样例只构造一次）
+        expected = frozenset(alert_types_list)
+        assert frozenset(retrieved_subscriptions) == expected
+        assert len(retrieved_subscriptions) == len(alert_types_list)
     
     @given(
-        user_id=st.text(min_size=1, max_size=50).filter(lambda x: x.strip()),
-        alert_type=st.sampled_from(list(AlertType))
+        user_id=USER_ID,
+        alert_type=_ALERTS_STRAT
     )
-    @settings(max_examples=100)
-    def test_property_alert_subscription_idempotence(self, user_id, alert_type):
+    def test_property_alert_subscription_idempotence(self, mgr, user_id, alert_type):
         """
         属性：警报订阅幂等性
         
         For any alert type, adding it multiple times should result in it appearing 
         only once in the subscription list.
         """
-        user_prefs_manager, db_path = self._create_temp_manager()
+        # Hypothesis 在同一夹具实例上重复执行测试体，每个样例开始前清空数据
+        mgr.cleanup_database()
         
-        try:
-            # 多次添加同一个警报类型
-            user_prefs_manager.add_alert_subscription(user_id, alert_type)
-            user_prefs_manager.add_alert_subscription(user_id, alert_type)
-            user_prefs_manager.add_alert_subscription(user_id, alert_type)
-            
-            # 获取订阅
-            subscriptions = user_prefs_manager.get_alert_subscriptions(user_id)
-            
-            # 验证只出现一次
-            assert subscriptions.count(alert_type) == 1
+        # 多次添加同一个警报类型
+        mgr.add_alert_subscription(user_id, alert_type)
+        mgr.add_alert_subscription(user_id, alert_type)
+        mgr.add_alert_subscription(user_id, alert_type)
         
-        finally:
-            self._cleanup_temp_db(db_path)
+        # 获取订阅
+        subscriptions = mgr.get_alert_subscriptions(user_id)
+        
+        # 验证只出现一次
+        assert subscriptions.count(alert_type) == 1
     
     @given(
-        user_id=st.text(min_size=1, max_size=50).filter(lambda x: x.strip()),
-        alert_type=st.sampled_from(list(AlertType))
+        user_id=USER_ID,
+        alert_type=_ALERTS_STRAT
     )
-    @settings(max_examples=100)
-    def test_property_alert_subscription_removal(self, user_id, alert_type):
+    def test_property_alert_subscription_removal(self, mgr, user_id, alert_type):
         """
         属性：警报订阅移除
         
         For any alert type, adding it and then removing it should result in 
         it not being in the subscription list.
         """
-        user_prefs_manager, db_path = self._create_temp_manager()
+        # Hypothesis 在同一夹具实例上重复执行测试体，每个样例开始前清空数据
+        mgr.cleanup_database()
         
-        try:
-            # 添加警报订阅
-            user_prefs_manager.add_alert_subscription(user_id, alert_type)
-            
-            # 验证存在
-            subscriptions = user_prefs_manager.get_alert_subscriptions(user_id)
-            assert alert_type in subscriptions
-            
-            # 移除订阅
-            user_prefs_manager.remove_alert_subscription(user_id, alert_type)
-            
-            # 验证不存在
-            subscriptions = user_prefs_manager.get_alert_subscriptions(user_id)
-            assert alert_type not in subscriptions
+        # 添加警报订阅
+        mgr.add_alert_subscription(user_id, alert_type)
+        
+        # 验证存在
+        subscriptions = mgr.get_alert_subscriptions(user_id)
+        assert alert_type in subscriptions
         
-        finally:
-            self._cleanup_temp_db(db_path)
+        # 移除订阅
+        mgr.remove_alert_subscription(user_id, alert_type)
+        
+        # 验证不存在
+        subscriptions = mgr.get_alert_subscriptions(user_id)
+        assert alert_type not in subscriptions
     
     @given(
         user_ids=st.lists(
-            st.text(min_size=1, max_size=50).filter(lambda x: x.strip()), 
+            USER_ID, 
             min_size=1, 
-            max_size=10, 
-            unique=True
+            max_size=10
         )
     )
     @settings(max_examples=50, deadline=None)
-    def test_property_user_isolation(self, user_ids):
+    def test_property_user_isolation(self, mgr, user_ids):
         """
         属性：用户隔离
         
         For any set of users, preferences set for one user should not affect 
         the preferences of other users.
         """
-        user_prefs_manager, db_path = self._create_temp_manager()
-        
-        try:
-            # 为每个用户设置不同的偏好
-            user_preferences = {}
-            for i, user_id in enumerate(user_ids):
-                location = f"Location_{i}"
-                units = "metric" if i % 2 == 0 else "imperial"
-                language = "zh" if i % 2 == 0 else "en"
-                
-                user_prefs_manager.set_default_location(user_id, location)
-                user_prefs_manager.set_units(user_id, units)
-                user_prefs_manager.set_language(user_id, language)
-                
-                user_preferences[user_id] = {
-                    'location': location,
-                    'units': units,
-                    'language': language
-                }
+        # Hypothesis 在同一夹具实例上重复执行测试体，每个样例开始前清空数据
+        mgr.cleanup_database()
+        
+        # 去重但保持顺序（不在策略中使用 unique=True，便于缩小反例）
+        user_ids = list(dict.fromkeys(user_ids))
+        
+        # 为每个用户设置不同的偏好
+        user_preferences = {}
+        for i, user_id in enumerate(user_ids):
+            location = f"Location_{i}"
+            units = "metric" if i % 2 == 0 else "imperial"
+            language = "zh" if i % 2 == 0 else "en"
+            
+            mgr.set_default_location(user_id, location)
+            mgr.set_units(user_id, units)
+            mgr.set_language(user_id, language)
+            
+            user_preferences[user_id] = {
+                'location': location,
+                'units': units,
+                'language': language
+            }
+        
+        # 验证每个用户的偏好都是独立的
+        for user_id, expected_prefs in user_preferences.items():
+            actual_prefs = mgr.get_user_preferences(user_id)
             
-            # 验证每个用户的偏好都是独立的
-            for user_id, expected_prefs in user_preferences.items():
-                actual_prefs = user_prefs_manager.get_user_preferences(user_id)
-                
-                assert actual_prefs.default_location == expected_prefs['location']
-                assert actual_prefs.units == expected_prefs['units']
-                assert actual_prefs.language == expected_prefs['language']
-        
-        finally:
-            self._cleanup_temp_db(db_path)
\ No newline at end of file
+            assert actual_prefs.default_location == expected_prefs['location']
+            assert actual_prefs.units == expected_prefs['units']
+            assert actual_prefs.language == expected_prefs['language']
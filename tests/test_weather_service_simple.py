@@ -75,7 +75,6 @@ class TestWeatherServiceCore:
         assert service.circuit_breaker is not None
         assert isinstance(service.circuit_breaker, CircuitBreaker)
     
-    @pytest.mark.asyncio
     async def test_get_current_weather_with_api_success(self, weather_service_mocked):
         """测试通过API成功获取当前天气"""
         service = weather_service_mocked
@@ -110,7 +109,6 @@ class TestWeatherServiceCore:
         service.api_client.fetch_current_weather.assert_called_once_with("北京")
         service.cache_manager.cache_weather_data.assert_called_once()
     
-    @pytest.mark.asyncio
     async def test_get_forecast_with_api_success(self, weather_service_mocked):
         """测试通过API成功获取预报"""
         service = weather_service_mocked
@@ -143,7 +141,6 @@ class TestWeatherServiceCore:
         service.api_client.fetch_forecast.assert_called_once_with("北京", 3)
         service.cache_manager.cache_forecast_data.assert_called_once()
     
-    @pytest.mark.asyncio
     async def test_api_error_handling(self, weather_service_mocked):
         """测试API错误处理"""
         service = weather_service_mocked
@@ -247,7 +244,6 @@ class TestWeatherServiceCore:
         assert "请求过于频繁" in service._get_friendly_error_message("rate_limit")
         assert "网络连接" in service._get_friendly_error_message("network_error")
     
-    @pytest.mark.asyncio
     async def test_invalid_forecast_days(self, weather_service_mocked):
         """测试无效的预报天数"""
         service = weather_service_mocked
@@ -258,7 +254,6 @@ class TestWeatherServiceCore:
         with pytest.raises(WeatherError, match="预报天数必须在 1-16 之间"):
             await service.get_forecast("北京", 20, "test_user")
     
-    @pytest.mark.asyncio
     async def test_invalid_hourly_hours(self, weather_service_mocked):
         """测试无效的小时数"""
         service = weather_service_mocked
@@ -282,7 +277,6 @@ class TestCircuitBreakerStandalone:
         assert cb.failure_count == 0
         assert cb.state == CircuitBreakerState.CLOSED
     
-    @pytest.mark.asyncio
     async def test_circuit_breaker_success(self):
         """测试断路器成功调用"""
         cb = CircuitBreaker()
@@ -295,10 +289,12 @@ class TestCircuitBreakerStandalone:
         assert cb.failure_count == 0
         assert cb.state == CircuitBreakerState.CLOSED
     
-    @pytest.mark.asyncio
     async def test_circuit_breaker_failure_and_recovery(self):
         """测试断路器失败和恢复"""
         cb = CircuitBreaker(failure_threshold=2, recovery_timeout=0.1)
+        # 使用可手动推进的时钟，无需真实等待恢复时间
+        now = [1000.0]
+        cb._now = lambda: now[0]
         
         async def failing_func():
             raise Exception("Test failure")
@@ -320,9 +316,8 @@ class TestCircuitBreakerStandalone:
         with pytest.raises(APIError, match="服务暂时不可用"):
             await cb.call(failing_func)
         
-        # 等待恢复时间
-        import asyncio
-        await asyncio.sleep(0.2)
+        # 推进时钟越过恢复时间
+        now[0] += 0.2
         
         # 成功调用应该重置断路器
         result = await cb.call(success_func)
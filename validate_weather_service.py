@@ -7,6 +7,13 @@
 
 import asyncio
 import sys
+from datetime import datetime
+
+try:
+    import uvloop
+except ImportError:  # uvloop 为可选依赖，缺失时使用标准事件循环
+    uvloop = None
+
 from weather_plugin.weather_service import WeatherService, CircuitBreaker
 from weather_plugin.config import WeatherConfig
 from weather_plugin.api_client import MockWeatherAPIClient
@@ -14,6 +21,9 @@ from weather_plugin.cache import CacheManager
 from weather_plugin.location_service import LocationService
 from weather_plugin.user_preferences import UserPreferences
 
+# 验证用的天气数据使用固定时间戳
+_FIXED_TS = datetime(2024, 1, 1, 12, 0, 0)
+
 
 async def main():
     """主验证函数"""
@@ -60,7 +70,6 @@ async def main():
         
         # 测试数据验证
         from weather_plugin.models import WeatherData
-        from datetime import datetime
         
         test_weather = WeatherData(
             location="北京",
@@ -74,7 +83,7 @@ async def main():
             uv_index=5.0,
             condition="晴朗",
             condition_code="01d",
-            timestamp=datetime.now(),
+            timestamp=_FIXED_TS,
             units="metric"
         )
         
@@ -113,5 +122,8 @@ async def main():
 
 
 if __name__ == "__main__":
-    success = asyncio.run(main())
+    if uvloop is not None:
+        success = uvloop.run(main())
+    else:
+        success = asyncio.run(main())
     sys.exit(0 if success else 1)
\ No newline at end of file
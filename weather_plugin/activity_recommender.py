@@ -4,12 +4,142 @@
 基于天气条件和季节提供个性化的活动推荐和安全建议。
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, FrozenSet, Tuple
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain
+import heapq
 import re
 
 from .interfaces import IActivityRecommender
-from .models import WeatherData, Activity, Season
+from .models import WeatherData, Activity, Season, WeatherCategory
+
+
+# 天气描述关键词，按语义标签分组（匹配前描述会先转为小写）
+_CONDITION_KEYWORDS: Dict[str, tuple] = {
+    'thunder': ('雷', 'thunder', '暴雨', 'storm'),
+    'rain': ('雨', 'rain', '毛毛雨', 'drizzle'),
+    'snow': ('雪', 'snow'),
+    'fog': ('雾', 'fog', '霾', 'haze'),
+    'clear': ('晴', 'clear', 'sunny'),
+    'cloud': ('云', 'cloud', 'overcast'),
+    'partly': ('多云', 'partly'),
+    'severe': ('雷', 'thunder', '暴', 'storm', '大雨', 'heavy rain',
+               '大雪', 'heavy snow', '冰雹', 'hail'),
+    'wet': ('雨', 'rain', '雷', 'thunder', '暴'),
+}
+
+# 每个关键词对应的标签集合：包含其自身及其所有子串关键词的标签
+_KEYWORD_TAGS: Dict[str, FrozenSet[str]] = {
+    keyword: frozenset(
+        tag for tag, words in _CONDITION_KEYWORDS.items()
+        if any(word in keyword for word in words)
+    )
+    for words in _CONDITION_KEYWORDS.values()
+    for keyword in words
+}
+
+# 所有关键词合并为一个正则，零宽前瞻保证重叠的关键词也能被找到；
+# 同一位置按最长关键词匹配，较短的前缀关键词已包含在其标签集合中
+_CONDITION_SCANNER = re.compile(
+    '(?=(' + '|'.join(map(re.escape, sorted(_KEYWORD_TAGS, key=len, reverse=True))) + '))'
+)
+
+
+def _scan_condition(condition_lower: str) -> FrozenSet[str]:
+    """一次扫描天气描述，返回命中的所有语义标签"""
+    tags = set()
+    for match in _CONDITION_SCANNER.finditer(condition_lower):
+        tags |= _KEYWORD_TAGS[match.group(1)]
+    return frozenset(tags)
+
+
+@lru_cache(maxsize=256)
+def _condition_tags(condition: str) -> FrozenSet[str]:
+    """
+    获取天气描述的语义标签
+    
+    按原始描述缓存，同一次推荐流程（活动推荐 + 安全建议）以及重复查询同一城市时，
+    描述只需转小写并扫描一次。不缓存在 WeatherData 上，因为其 condition 在服务层会被改写。
+    """
+    return _scan_condition(condition.lower())
+
+
+# _category_from_tags 可能返回的全部天气分类
+_WEATHER_CATEGORIES = tuple(WeatherCategory)
+
+
+def _category_from_tags(tags: FrozenSet[str]) -> WeatherCategory:
+    """根据语义标签确定天气分类（按恶劣程度优先）"""
+    if 'thunder' in tags:
+        return WeatherCategory.THUNDERSTORM
+    elif 'rain' in tags:
+        return WeatherCategory.RAIN
+    elif 'snow' in tags:
+        return WeatherCategory.SNOW
+    elif 'fog' in tags:
+        return WeatherCategory.HAZE
+    elif 'clear' in tags:
+        return WeatherCategory.SUNNY
+    elif 'cloud' in tags:
+        if 'partly' in tags:
+            return WeatherCategory.PARTLY_CLOUDY
+        else:
+            return WeatherCategory.OVERCAST
+    else:
+        return WeatherCategory.PARTLY_CLOUDY  # 默认分类
+
+
+# 天气阈值（温度 °C、风速 km/h、湿度 %、UV 指数、能见度 km），
+# 使用模块常量以免热路径上反复查嵌套字典
+_T_VERY_COLD = -10
+_T_COLD = 5
+_T_COOL = 15
+_T_WARM = 25
+_T_HOT = 30
+_T_VERY_HOT = 35
+_WIND_CALM = 5
+_WIND_LIGHT = 15
+_WIND_MODERATE = 25
+_WIND_STRONG = 35
+_HUM_LOW = 30
+_HUM_COMFORTABLE = 60
+_HUM_HIGH = 80
+_UV_LOW = 2
+_UV_MODERATE = 5
+_UV_HIGH = 7
+_UV_VERY_HIGH = 10
+_VIS_VERY_LOW = 1.0
+_VIS_LOW = 5.0
+_VIS_GOOD = 10.0
+
+
+# 安全建议文案，模块加载时创建一次
+_REC_VERY_COLD = ("极寒天气，避免长时间户外活动", "穿着多层保暖衣物", "注意防止冻伤")
+_REC_COLD = ("天气寒冷，注意保暖", "户外活动时间不宜过长")
+_REC_VERY_HOT = ("高温天气，避免中午时段户外活动", "多补充水分，预防中暑", "穿着轻薄透气衣物")
+_REC_HOT = ("天气炎热，注意防暑降温", "户外活动请做好防晒")
+_REC_STRONG_WIND = ("大风天气，避免高空作业", "注意固定户外物品", "骑行时要格外小心")
+_REC_MODERATE_WIND = ("风力较大，户外活动注意安全",)
+_REC_HIGH_HUMIDITY = ("湿度较高，注意通风", "运动时容易出汗，及时补水")
+_REC_LOW_HUMIDITY = ("空气干燥，注意补水", "使用润肤霜保护皮肤")
+_REC_VERY_HIGH_UV = ("紫外线极强，避免长时间暴露在阳光下", "使用SPF30+防晒霜", "佩戴帽子和太阳镜")
+_REC_HIGH_UV = ("紫外线较强，注意防晒", "使用防晒霜")
+_REC_WET = ("雨天路滑，注意行走安全", "避免在空旷地带活动", "携带雨具")
+_REC_SNOW = ("雪天路滑，小心行走", "注意保暖防滑", "清理车辆积雪")
+_REC_FOG = ("能见度低，注意交通安全", "减少户外运动", "佩戴口罩")
+_REC_VERY_LOW_VISIBILITY = ("能见度极低，避免驾驶", "户外活动需格外小心")
+_REC_LOW_VISIBILITY = ("能见度较低，注意交通安全",)
+
+# 月份 -> 季节，按月份下标直接查表（下标 0 不使用）
+_MONTH_TO_SEASON = (
+    None,
+    Season.WINTER, Season.WINTER,
+    Season.SPRING, Season.SPRING, Season.SPRING,
+    Season.SUMMER, Season.SUMMER, Season.SUMMER,
+    Season.AUTUMN, Season.AUTUMN, Season.AUTUMN,
+    Season.WINTER,
+)
 
 
 class ActivityRecommender(IActivityRecommender):
@@ -19,6 +149,11 @@ class ActivityRecommender(IActivityRecommender):
         """初始化活动推荐器"""
         self._init_activity_database()
         self._init_weather_thresholds()
+        
+        # 结果只取决于离散化后的天气特征，按实例缓存；
+        # 缓存键精确对应各个判断分支的结果，命中时输出与重新计算完全一致
+        self._cached_recommendations = lru_cache(maxsize=256)(self._recommend_for)
+        self._cached_safety_recommendations = lru_cache(maxsize=256)(self._assemble_safety_recommendations)
     
     def _init_activity_database(self) -> None:
         """初始化活动数据库"""
@@ -28,7 +163,7 @@ class ActivityRecommender(IActivityRecommender):
                 name="跑步",
                 description="户外慢跑或快跑锻炼",
                 category="运动",
-                suitable_weather=["晴天", "多云", "阴天"],
+                suitable_weather={WeatherCategory.SUNNY, WeatherCategory.PARTLY_CLOUDY, WeatherCategory.OVERCAST},
                 season=None,  # 全季节
                 indoor=False,
                 safety_notes=["注意防晒", "携带水分", "穿着合适的运动鞋"]
@@ -37,7 +172,7 @@ class ActivityRecommender(IActivityRecommender):
                 name="骑行",
                 description="自行车骑行运动",
                 category="运动",
-                suitable_weather=["晴天", "多云"],
+                suitable_weather={WeatherCategory.SUNNY, WeatherCategory.PARTLY_CLOUDY},
                 season=None,
                 indoor=False,
                 safety_notes=["佩戴头盔", "注意交通安全", "检查自行车状况"]
@@ -46,7 +181,7 @@ class ActivityRecommender(IActivityRecommender):
                 name="徒步登山",
                 description="山地徒步或登山活动",
                 category="运动",
-                suitable_weather=["晴天", "多云"],
+                suitable_weather={WeatherCategory.SUNNY, WeatherCategory.PARTLY_CLOUDY},
                 season=Season.SPRING,
                 indoor=False,
                 safety_notes=["穿着防滑鞋", "携带足够水和食物", "告知他人行程"]
@@ -55,7 +190,7 @@ class ActivityRecommender(IActivityRecommender):
                 name="游泳",
                 description="游泳锻炼",
                 category="运动",
-                suitable_weather=["晴天", "多云"],
+                suitable_weather={WeatherCategory.SUNNY, WeatherCategory.PARTLY_CLOUDY},
                 season=Season.SUMMER,
                 indoor=False,
                 safety_notes=["注意水质", "不要独自游泳", "注意防晒"]
@@ -66,7 +201,7 @@ class ActivityRecommender(IActivityRecommender):
                 name="公园散步",
                 description="在公园或绿地悠闲散步",
                 category="休闲",
-                suitable_weather=["晴天", "多云", "阴天"],
+                suitable_weather={WeatherCategory.SUNNY, WeatherCategory.PARTLY_CLOUDY, WeatherCategory.OVERCAST},
                 season=None,
                 indoor=False,
                 safety_notes=["穿着舒适的鞋子", "注意路面状况"]
@@ -75,7 +210,7 @@ class ActivityRecommender(IActivityRecommender):
                 name="野餐",
                 description="户外野餐活动",
                 category="休闲",
-                suitable_weather=["晴天", "多云"],
+                suitable_weather={WeatherCategory.SUNNY, WeatherCategory.PARTLY_CLOUDY},
                 season=Season.SPRING,
                 indoor=False,
                 safety_notes=["选择安全场所", "注意食物保鲜", "清理垃圾"]
@@ -84,7 +219,7 @@ class ActivityRecommender(IActivityRecommender):
                 name="摄影",
                 description="户外摄影创作",
                 category="艺术",
-                suitable_weather=["晴天", "多云", "阴天"],
+                suitable_weather={WeatherCategory.SUNNY, WeatherCategory.PARTLY_CLOUDY, WeatherCategory.OVERCAST},
                 season=None,
                 indoor=False,
                 safety_notes=["保护设备", "注意个人安全", "尊重他人隐私"]
@@ -95,7 +230,7 @@ class ActivityRecommender(IActivityRecommender):
                 name="健身房锻炼",
                 description="室内健身房运动",
                 category="运动",
-                suitable_weather=["雨天", "雪天", "雷暴"],
+                suitable_weather={WeatherCategory.RAIN, WeatherCategory.SNOW, WeatherCategory.THUNDERSTORM},
                 season=None,
                 indoor=True,
                 safety_notes=["正确使用器械", "适量运动", "注意补水"]
@@ -104,7 +239,7 @@ class ActivityRecommender(IActivityRecommender):
                 name="瑜伽",
                 description="室内瑜伽练习",
                 category="运动",
-                suitable_weather=["雨天", "雪天", "雷暴"],
+                suitable_weather={WeatherCategory.RAIN, WeatherCategory.SNOW, WeatherCategory.THUNDERSTORM},
                 season=None,
                 indoor=True,
                 safety_notes=["使用瑜伽垫", "量力而行", "保持呼吸"]
@@ -113,7 +248,7 @@ class ActivityRecommender(IActivityRecommender):
                 name="读书",
                 description="室内阅读",
                 category="学习",
-                suitable_weather=["雨天", "雪天", "雷暴"],
+                suitable_weather={WeatherCategory.RAIN, WeatherCategory.SNOW, WeatherCategory.THUNDERSTORM},
                 season=None,
                 indoor=True,
                 safety_notes=["保持良好坐姿", "注意光线", "定时休息"]
@@ -122,7 +257,7 @@ class ActivityRecommender(IActivityRecommender):
                 name="看电影",
                 description="观看电影",
                 category="娱乐",
-                suitable_weather=["雨天", "雪天", "雷暴"],
+                suitable_weather={WeatherCategory.RAIN, WeatherCategory.SNOW, WeatherCategory.THUNDERSTORM},
                 season=None,
                 indoor=True,
                 safety_notes=["控制观看时间", "选择合适音量"]
@@ -133,7 +268,7 @@ class ActivityRecommender(IActivityRecommender):
                 name="赏花",
                 description="观赏春季花卉",
                 category="休闲",
-                suitable_weather=["晴天", "多云"],
+                suitable_weather={WeatherCategory.SUNNY, WeatherCategory.PARTLY_CLOUDY},
                 season=Season.SPRING,
                 indoor=False,
                 safety_notes=["注意花粉过敏", "不要采摘花朵"]
@@ -142,7 +277,7 @@ class ActivityRecommender(IActivityRecommender):
                 name="海滩活动",
                 description="海滩游玩",
                 category="休闲",
-                suitable_weather=["晴天"],
+                suitable_weather={WeatherCategory.SUNNY},
                 season=Season.SUMMER,
                 indoor=False,
                 safety_notes=["涂抹防晒霜", "注意海浪", "补充水分"]
@@ -151,7 +286,7 @@ class ActivityRecommender(IActivityRecommender):
                 name="赏秋叶",
                 description="观赏秋季红叶",
                 category="休闲",
-                suitable_weather=["晴天", "多云"],
+                suitable_weather={WeatherCategory.SUNNY, WeatherCategory.PARTLY_CLOUDY},
                 season=Season.AUTUMN,
                 indoor=False,
                 safety_notes=["穿着保暖衣物", "注意路面湿滑"]
@@ -160,42 +295,96 @@ class ActivityRecommender(IActivityRecommender):
                 name="滑雪",
                 description="滑雪运动",
                 category="运动",
-                suitable_weather=["雪天"],
+                suitable_weather={WeatherCategory.SNOW},
                 season=Season.WINTER,
                 indoor=False,
                 safety_notes=["穿戴防护装备", "选择适合难度", "注意保暖"]
             ),
         ]
+        
+        # 倒排索引：(天气分类, 是否恶劣天气) -> 适合的活动，保持活动库中的顺序
+        self._activity_index = {
+            (weather_category, is_severe): tuple(self._scan_activities(
+                self.activities, weather_category, is_severe
+            ))
+            for weather_category in _WEATHER_CATEGORIES
+            for is_severe in (False, True)
+        }
     
     def _init_weather_thresholds(self) -> None:
-        """初始化天气阈值"""
+        """初始化天气阈值（对外保留字典形式，内部判断直接使用模块常量）"""
         self.weather_thresholds = {
             'temperature': {
-                'very_cold': -10,
-                'cold': 5,
-                'cool': 15,
-                'warm': 25,
-                'hot': 30,
-                'very_hot': 35
+                'very_cold': _T_VERY_COLD,
+                'cold': _T_COLD,
+                'cool': _T_COOL,
+                'warm': _T_WARM,
+                'hot': _T_HOT,
+                'very_hot': _T_VERY_HOT
             },
             'wind_speed': {
-                'calm': 5,
-                'light': 15,
-                'moderate': 25,
-                'strong': 35
+                'calm': _WIND_CALM,
+                'light': _WIND_LIGHT,
+                'moderate': _WIND_MODERATE,
+                'strong': _WIND_STRONG
             },
             'humidity': {
-                'low': 30,
-                'comfortable': 60,
-                'high': 80
+                'low': _HUM_LOW,
+                'comfortable': _HUM_COMFORTABLE,
+                'high': _HUM_HIGH
             },
             'uv_index': {
-                'low': 2,
-                'moderate': 5,
-                'high': 7,
-                'very_high': 10
+                'low': _UV_LOW,
+                'moderate': _UV_MODERATE,
+                'high': _UV_HIGH,
+                'very_high': _UV_VERY_HIGH
             }
         }
+        
+        self._init_safety_rules()
+    
+    def _init_safety_rules(self) -> None:
+        """
+        初始化安全建议决策表
+        
+        每组规则按顺序检查，命中第一条即采用其建议并跳到下一组；
+        判断函数的参数为 (天气数据, 天气描述标签)。
+        """
+        self._safety_rules = (
+            # 温度相关建议
+            (
+                (lambda w, tags: w.temperature <= _T_VERY_COLD, _REC_VERY_COLD),
+                (lambda w, tags: w.temperature <= _T_COLD, _REC_COLD),
+                (lambda w, tags: w.temperature >= _T_VERY_HOT, _REC_VERY_HOT),
+                (lambda w, tags: w.temperature >= _T_HOT, _REC_HOT),
+            ),
+            # 风速相关建议
+            (
+                (lambda w, tags: w.wind_speed >= _WIND_STRONG, _REC_STRONG_WIND),
+                (lambda w, tags: w.wind_speed >= _WIND_MODERATE, _REC_MODERATE_WIND),
+            ),
+            # 湿度相关建议
+            (
+                (lambda w, tags: w.humidity >= _HUM_HIGH, _REC_HIGH_HUMIDITY),
+                (lambda w, tags: w.humidity <= _HUM_LOW, _REC_LOW_HUMIDITY),
+            ),
+            # UV指数相关建议
+            (
+                (lambda w, tags: w.uv_index >= _UV_VERY_HIGH, _REC_VERY_HIGH_UV),
+                (lambda w, tags: w.uv_index >= _UV_HIGH, _REC_HIGH_UV),
+            ),
+            # 天气条件相关建议
+            (
+                (lambda w, tags: 'wet' in tags, _REC_WET),
+                (lambda w, tags: 'snow' in tags, _REC_SNOW),
+                (lambda w, tags: 'fog' in tags, _REC_FOG),
+            ),
+            # 能见度相关建议（小于1公里 / 小于5公里）
+            (
+                (lambda w, tags: w.visibility < _VIS_VERY_LOW, _REC_VERY_LOW_VISIBILITY),
+                (lambda w, tags: w.visibility < _VIS_LOW, _REC_LOW_VISIBILITY),
+            ),
+        )
     
     def recommend_activities(self, weather: WeatherData, season: Season) -> List[Activity]:
         """
@@ -208,20 +397,44 @@ class ActivityRecommender(IActivityRecommender):
         Returns:
             推荐的活动列表
         """
+        # 天气分类和恶劣天气判断在本次推荐中只计算一次
+        weather_category, is_severe = self._classify_weather(weather)
+        environment_scores = self._environment_scores(weather)
+        
+        # 缓存中的元组被多次共享，Activity 不可变，只需在边界复制为列表
+        return list(self._cached_recommendations(
+            weather_category, is_severe, season, environment_scores
+        ))
+    
+    def _recommend_for(self, weather_category: WeatherCategory, is_severe: bool, season: Season,
+                       environment_scores: Tuple[float, float]) -> Tuple[Activity, ...]:
+        """
+        根据离散化后的天气特征推荐活动
+        
+        Args:
+            weather_category: 天气分类
+            is_severe: 是否为恶劣天气
+            season: 当前季节
+            environment_scores: _environment_scores 的结果
+            
+        Returns:
+            推荐的活动元组（作为缓存值不可变）
+        """
         suitable_activities = []
         
         # 根据天气条件过滤活动
-        weather_filtered = self.filter_by_weather_conditions(self.activities, weather)
+        weather_filtered = self._filter_by_category(self.activities, weather_category, is_severe)
         
         # 根据季节进一步过滤
         for activity in weather_filtered:
             if activity.season is None or activity.season == season:
                 suitable_activities.append(activity)
         
-        # 根据天气条件排序推荐优先级
-        suitable_activities.sort(key=lambda x: self._calculate_activity_score(x, weather))
-        
-        return suitable_activities[:8]  # 返回前8个推荐
+        # 根据天气条件选出前8个推荐（与稳定排序后取前8个的结果一致）
+        return tuple(heapq.nsmallest(
+            8, suitable_activities,
+            key=lambda x: self._score_activity(x, weather_category, environment_scores)
+        ))
     
     def get_safety_recommendations(self, weather: WeatherData) -> List[str]:
         """
@@ -233,99 +446,32 @@ class ActivityRecommender(IActivityRecommender):
         Returns:
             安全建议列表
         """
-        recommendations = []
+        tags = _condition_tags(weather.condition)
         
-        # 温度相关建议
-        temp = weather.temperature
-        if temp <= self.weather_thresholds['temperature']['very_cold']:
-            recommendations.extend([
-                "极寒天气，避免长时间户外活动",
-                "穿着多层保暖衣物",
-                "注意防止冻伤"
-            ])
-        elif temp <= self.weather_thresholds['temperature']['cold']:
-            recommendations.extend([
-                "天气寒冷，注意保暖",
-                "户外活动时间不宜过长"
-            ])
-        elif temp >= self.weather_thresholds['temperature']['very_hot']:
-            recommendations.extend([
-                "高温天气，避免中午时段户外活动",
-                "多补充水分，预防中暑",
-                "穿着轻薄透气衣物"
-            ])
-        elif temp >= self.weather_thresholds['temperature']['hot']:
-            recommendations.extend([
-                "天气炎热，注意防暑降温",
-                "户外活动请做好防晒"
-            ])
-        
-        # 风速相关建议
-        if weather.wind_speed >= self.weather_thresholds['wind_speed']['strong']:
-            recommendations.extend([
-                "大风天气，避免高空作业",
-                "注意固定户外物品",
-                "骑行时要格外小心"
-            ])
-        elif weather.wind_speed >= self.weather_thresholds['wind_speed']['moderate']:
-            recommendations.append("风力较大，户外活动注意安全")
-        
-        # 湿度相关建议
-        if weather.humidity >= self.weather_thresholds['humidity']['high']:
-            recommendations.extend([
-                "湿度较高，注意通风",
-                "运动时容易出汗，及时补水"
-            ])
-        elif weather.humidity <= self.weather_thresholds['humidity']['low']:
-            recommendations.extend([
-                "空气干燥，注意补水",
-                "使用润肤霜保护皮肤"
-            ])
-        
-        # UV指数相关建议
-        if weather.uv_index >= self.weather_thresholds['uv_index']['very_high']:
-            recommendations.extend([
-                "紫外线极强，避免长时间暴露在阳光下",
-                "使用SPF30+防晒霜",
-                "佩戴帽子和太阳镜"
-            ])
-        elif weather.uv_index >= self.weather_thresholds['uv_index']['high']:
-            recommendations.extend([
-                "紫外线较强，注意防晒",
-                "使用防晒霜"
-            ])
-        
-        # 天气条件相关建议
-        condition_lower = weather.condition.lower()
-        if any(word in condition_lower for word in ['雨', 'rain', '雷', 'thunder', '暴']):
-            recommendations.extend([
-                "雨天路滑，注意行走安全",
-                "避免在空旷地带活动",
-                "携带雨具"
-            ])
-        elif any(word in condition_lower for word in ['雪', 'snow']):
-            recommendations.extend([
-                "雪天路滑，小心行走",
-                "注意保暖防滑",
-                "清理车辆积雪"
-            ])
-        elif any(word in condition_lower for word in ['雾', 'fog', '霾', 'haze']):
-            recommendations.extend([
-                "能见度低，注意交通安全",
-                "减少户外运动",
-                "佩戴口罩"
-            ])
-        
-        # 能见度相关建议
-        if weather.visibility < 1.0:  # 能见度小于1公里
-            recommendations.extend([
-                "能见度极低，避免驾驶",
-                "户外活动需格外小心"
-            ])
-        elif weather.visibility < 5.0:  # 能见度小于5公里
-            recommendations.append("能见度较低，注意交通安全")
-        
-        return recommendations
+        # 每组规则命中的序号（未命中为 -1），作为建议文案的缓存键
+        decision = tuple(
+            next((index for index, (predicate, _) in enumerate(rule_group) if predicate(weather, tags)), -1)
+            for rule_group in self._safety_rules
+        )
+        
+        return list(self._cached_safety_recommendations(decision))
+    
+    def _assemble_safety_recommendations(self, decision: Tuple[int, ...]) -> Tuple[str, ...]:
+        """
+        根据每组规则的命中结果拼接安全建议
+        
+        Args:
+            decision: 每组规则命中的序号，-1 表示该组未命中
+            
+        Returns:
+            安全建议元组（作为缓存值不可变）
+        """
+        # 直接从命中的文案元组拼接，不创建中间列表
+        return tuple(chain.from_iterable(
+            rule_group[index][1]
+            for rule_group, index in zip(self._safety_rules, decision)
+            if index >= 0
+        ))
     
     def filter_by_weather_conditions(self, activities: List[Activity], weather: WeatherData) -> List[Activity]:
         """
@@ -338,20 +484,56 @@ class ActivityRecommender(IActivityRecommender):
         Returns:
             适合当前天气的活动列表
         """
+        weather_category, is_severe = self._classify_weather(weather)
+        return self._filter_by_category(activities, weather_category, is_severe)
+    
+    def _filter_by_category(self, activities: List[Activity], weather_category: WeatherCategory,
+                            is_severe: bool) -> List[Activity]:
+        """
+        根据已确定的天气分类过滤活动
+        
+        Args:
+            activities: 活动列表
+            weather_category: 天气分类
+            is_severe: 是否为恶劣天气
+            
+        Returns:
+            适合当前天气的活动列表
+        """
+        if activities is self.activities:
+            return list(self._activity_index[(weather_category, is_severe)])
+        return self._scan_activities(activities, weather_category, is_severe)
+    
+    @staticmethod
+    def _scan_activities(activities: List[Activity], weather_category: WeatherCategory,
+                         is_severe: bool) -> List[Activity]:
+        """逐个检查活动是否适合当前天气（活动列表不是活动库时使用）"""
         suitable_activities = []
-        weather_category = self._categorize_weather(weather)
         
         for activity in activities:
             # 检查天气条件是否适合
             if weather_category in activity.suitable_weather:
                 suitable_activities.append(activity)
             # 如果是恶劣天气，推荐室内活动
-            elif self._is_severe_weather(weather) and activity.indoor:
+            elif is_severe and activity.indoor:
                 suitable_activities.append(activity)
         
         return suitable_activities
     
-    def _categorize_weather(self, weather: WeatherData) -> str:
+    def _classify_weather(self, weather: WeatherData) -> Tuple[WeatherCategory, bool]:
+        """
+        扫描一次天气描述，同时得到天气分类和是否为恶劣天气
+        
+        Args:
+            weather: 天气数据
+            
+        Returns:
+            (天气分类, 是否为恶劣天气)
+        """
+        tags = _condition_tags(weather.condition)
+        return _category_from_tags(tags), self._is_severe(weather, tags)
+    
+    def _categorize_weather(self, weather: WeatherData) -> WeatherCategory:
         """
         将天气数据分类为简单的天气类型
         
@@ -359,28 +541,9 @@ class ActivityRecommender(IActivityRecommender):
             weather: 天气数据
             
         Returns:
-            天气类型字符串
+            天气分类
         """
-        condition_lower = weather.condition.lower()
-        
-        # 检查恶劣天气
-        if any(word in condition_lower for word in ['雷', 'thunder', '暴雨', 'storm']):
-            return "雷暴"
-        elif any(word in condition_lower for word in ['雨', 'rain', '毛毛雨', 'drizzle']):
-            return "雨天"
-        elif any(word in condition_lower for word in ['雪', 'snow']):
-            return "雪天"
-        elif any(word in condition_lower for word in ['雾', 'fog', '霾', 'haze']):
-            return "雾霾"
-        elif any(word in condition_lower for word in ['晴', 'clear', 'sunny']):
-            return "晴天"
-        elif any(word in condition_lower for word in ['云', 'cloud', 'overcast']):
-            if '多云' in condition_lower or 'partly' in condition_lower:
-                return "多云"
-            else:
-                return "阴天"
-        else:
-            return "多云"  # 默认分类
+        return _category_from_tags(_condition_tags(weather.condition))
     
     def _is_severe_weather(self, weather: WeatherData) -> bool:
         """
@@ -392,28 +555,24 @@ class ActivityRecommender(IActivityRecommender):
         Returns:
             是否为恶劣天气
         """
-        condition_lower = weather.condition.lower()
-        
+        return self._is_severe(weather, _condition_tags(weather.condition))
+    
+    def _is_severe(self, weather: WeatherData, tags: FrozenSet[str]) -> bool:
+        """根据已扫描的天气描述标签和数值判断是否为恶劣天气"""
         # 检查恶劣天气条件
-        severe_conditions = [
-            '雷', 'thunder', '暴', 'storm', '大雨', 'heavy rain',
-            '大雪', 'heavy snow', '冰雹', 'hail'
-        ]
-        
-        if any(word in condition_lower for word in severe_conditions):
+        if 'severe' in tags:
             return True
         
         # 检查极端温度
-        if (weather.temperature <= self.weather_thresholds['temperature']['very_cold'] or
-            weather.temperature >= self.weather_thresholds['temperature']['very_hot']):
+        if weather.temperature <= _T_VERY_COLD or weather.temperature >= _T_VERY_HOT:
             return True
         
         # 检查强风
-        if weather.wind_speed >= self.weather_thresholds['wind_speed']['strong']:
+        if weather.wind_speed >= _WIND_STRONG:
             return True
         
         # 检查能见度
-        if weather.visibility < 1.0:
+        if weather.visibility < _VIS_VERY_LOW:
             return True
         
         return False
@@ -426,6 +585,23 @@ class ActivityRecommender(IActivityRecommender):
             activity: 活动
             weather: 天气数据
             
+        Returns:
+            活动分数
+        """
+        return self._score_activity(
+            activity, self._categorize_weather(weather), self._environment_scores(weather)
+        )
+    
+    def _score_activity(self, activity: Activity, weather_category: WeatherCategory,
+                        environment_scores: Tuple[float, float]) -> float:
+        """
+        使用已确定的天气分类和环境分数计算活动的推荐分数
+        
+        Args:
+            activity: 活动
+            weather_category: 天气分类
+            environment_scores: _environment_scores 的结果
+            
         Returns:
             活动分数
         """
@@ -435,44 +611,57 @@ class ActivityRecommender(IActivityRecommender):
         score += 50.0
         
         # 天气适宜性加分
-        weather_category = self._categorize_weather(weather)
         if weather_category in activity.suitable_weather:
             score += 30.0
         
+        # 温度、风速、UV指数和能见度的影响只取决于天气和是否室内
+        indoor_score, outdoor_score = environment_scores
+        score += indoor_score if activity.indoor else outdoor_score
+        
+        return score
+    
+    def _environment_scores(self, weather: WeatherData) -> Tuple[float, float]:
+        """
+        计算天气环境对活动分数的影响，每次推荐只需计算一次
+        
+        Args:
+            weather: 天气数据
+            
+        Returns:
+            (室内活动的环境分数, 户外活动的环境分数)
+        """
+        # 室内活动不受温度、风速、UV指数和能见度影响
+        indoor_score = 20.0
+        outdoor_score = 0.0
+        
         # 温度适宜性加分
         temp = weather.temperature
-        if activity.indoor:
-            score += 20.0  # 室内活动不受温度影响
+        if _T_COOL <= temp <= _T_WARM:
+            outdoor_score += 25.0  # 温度适宜
+        elif _T_COLD <= temp <= _T_HOT:
+            outdoor_score += 15.0  # 温度可接受
         else:
-            if self.weather_thresholds['temperature']['cool'] <= temp <= self.weather_thresholds['temperature']['warm']:
-                score += 25.0  # 温度适宜
-            elif self.weather_thresholds['temperature']['cold'] <= temp <= self.weather_thresholds['temperature']['hot']:
-                score += 15.0  # 温度可接受
-            else:
-                score -= 20.0  # 温度不适宜
+            outdoor_score -= 20.0  # 温度不适宜
         
         # 风速影响
-        if not activity.indoor:
-            if weather.wind_speed <= self.weather_thresholds['wind_speed']['light']:
-                score += 10.0
-            elif weather.wind_speed >= self.weather_thresholds['wind_speed']['strong']:
-                score -= 15.0
-        
-        # UV指数影响（对户外活动）
-        if not activity.indoor:
-            if weather.uv_index <= self.weather_thresholds['uv_index']['moderate']:
-                score += 5.0
-            elif weather.uv_index >= self.weather_thresholds['uv_index']['very_high']:
-                score -= 10.0
+        if weather.wind_speed <= _WIND_LIGHT:
+            outdoor_score += 10.0
+        elif weather.wind_speed >= _WIND_STRONG:
+            outdoor_score -= 15.0
+        
+        # UV指数影响
+        if weather.uv_index <= _UV_MODERATE:
+            outdoor_score += 5.0
+        elif weather.uv_index >= _UV_VERY_HIGH:
+            outdoor_score -= 10.0
         
         # 能见度影响
-        if not activity.indoor:
-            if weather.visibility >= 10.0:
-                score += 5.0
-            elif weather.visibility < 1.0:
-                score -= 20.0
+        if weather.visibility >= _VIS_GOOD:
+            outdoor_score += 5.0
+        elif weather.visibility < _VIS_VERY_LOW:
+            outdoor_score -= 20.0
         
-        return score
+        return indoor_score, outdoor_score
     
     def get_current_season(self) -> Season:
         """
@@ -481,13 +670,4 @@ class ActivityRecommender(IActivityRecommender):
         Returns:
             当前季节
         """
-        month = datetime.now().month
-        
-        if month in [3, 4, 5]:
-            return Season.SPRING
-        elif month in [6, 7, 8]:
-            return Season.SUMMER
-        elif month in [9, 10, 11]:
-            return Season.AUTUMN
-        else:
-            return Season.WINTER
\ No newline at end of file
+        return _MONTH_TO_SEASON[datetime.now().month]
\ No newline at end of file
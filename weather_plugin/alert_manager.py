@@ -5,10 +5,14 @@
 包括恶劣天气、温度变化、降水、风力和紫外线指数警报。
 """
 
+import asyncio
 import logging
+import queue
 import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from .interfaces import IAlertManager
 from .models import (
     WeatherAlert, AlertType, UserPrefs, WeatherData,
@@ -17,6 +21,44 @@ from .models import (
 from .localization import localization_manager
 
 
+@dataclass(frozen=True, slots=True)
+class _Thresholds:
+    """警报阈值（运行期间不变）"""
+    # 恶劣天气
+    severe_wind_ms: float = 17.0          # 8级风以上 (m/s)
+    visibility_km: float = 1.0            # 能见度低于1公里
+    severe_conditions: tuple = ('thunderstorm', 'tornado', 'hurricane', 'blizzard')
+    # 温度变化
+    daily_change_celsius: float = 10.0    # 日温差超过10度
+    extreme_high_celsius: float = 35.0    # 高温预警
+    extreme_low_celsius: float = -10.0    # 低温预警
+    # 降水
+    heavy_rain_chance: int = 80           # 降雨概率超过80%
+    snow_conditions: tuple = ('snow', 'heavy_snow', 'blizzard')
+    # 风力
+    strong_wind_ms: float = 13.9          # 7级风以上
+    gale_wind_ms: float = 17.2            # 8级风以上
+    # 紫外线
+    high_uv: float = 8.0                  # 紫外线指数高
+    very_high_uv: float = 11.0            # 紫外线指数极高
+
+
+# 数据库中保存的警报类型值 -> AlertType，避免逐行构造枚举
+_ALERT_TYPE_BY_VALUE = {alert_type.value: alert_type for alert_type in AlertType}
+
+# 连接池中保留的最大空闲连接数
+_POOL_SIZE = 5
+
+# 每个新连接都要设置的 PRAGMA（这些设置只对当前连接生效）
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",      # WAL 模式下只在检查点时 fsync
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",     # 256MB 内存映射读取
+    "PRAGMA cache_size=-20000",       # 约 20MB 页缓存
+    "PRAGMA busy_timeout=5000",       # 写锁冲突时最多等待 5 秒
+)
+
+
 class AlertManager(IAlertManager):
     """天气警报管理器实现"""
     
@@ -30,39 +72,90 @@ class AlertManager(IAlertManager):
         self.logger = logging.getLogger(__name__)
         self.db_path = db_path
         
-        # 警报阈值配置
+        # 长连接池：连接按需创建，用完归还，避免每次操作都重新打开数据库
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=_POOL_SIZE)
+        
+        # 警报阈值配置，判断时直接读取属性
+        self.thresholds = _Thresholds()
+        
+        # 按警报类型分组的阈值字典（对外保留的只读视图）
+        thresholds = self.thresholds
         self.alert_thresholds = {
             AlertType.SEVERE_WEATHER: {
-                'wind_speed_ms': 17.0,  # 8级风以上 (m/s)
-                'visibility_km': 1.0,   # 能见度低于1公里
-                'conditions': ['thunderstorm', 'tornado', 'hurricane', 'blizzard']
+                'wind_speed_ms': thresholds.severe_wind_ms,
+                'visibility_km': thresholds.visibility_km,
+                'conditions': list(thresholds.severe_conditions)
             },
             AlertType.TEMPERATURE_CHANGE: {
-                'daily_change_celsius': 10.0,  # 日温差超过10度
-                'extreme_high_celsius': 35.0,  # 高温预警
-                'extreme_low_celsius': -10.0   # 低温预警
+                'daily_change_celsius': thresholds.daily_change_celsius,
+                'extreme_high_celsius': thresholds.extreme_high_celsius,
+                'extreme_low_celsius': thresholds.extreme_low_celsius
             },
             AlertType.PRECIPITATION: {
-                'heavy_rain_chance': 80,       # 降雨概率超过80%
-                'snow_conditions': ['snow', 'heavy_snow', 'blizzard']
+                'heavy_rain_chance': thresholds.heavy_rain_chance,
+                'snow_conditions': list(thresholds.snow_conditions)
             },
             AlertType.WIND: {
-                'strong_wind_ms': 13.9,       # 7级风以上
-                'gale_wind_ms': 17.2          # 8级风以上
+                'strong_wind_ms': thresholds.strong_wind_ms,
+                'gale_wind_ms': thresholds.gale_wind_ms
             },
             AlertType.UV_INDEX: {
-                'high_uv': 8.0,               # 紫外线指数高
-                'very_high_uv': 11.0          # 紫外线指数极高
+                'high_uv': thresholds.high_uv,
+                'very_high_uv': thresholds.very_high_uv
             }
         }
         
+        # 警报文案模板缓存：(语言, 消息键) -> 模板
+        self._templates: Dict[tuple, str] = {}
+        
         # 初始化数据库
         self._init_database()
     
+    def _create_connection(self) -> sqlite3.Connection:
+        """创建新的数据库连接（连接可能在不同线程间复用）"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    @contextmanager
+    def _conn(self) -> Iterator[sqlite3.Connection]:
+        """
+        从连接池借出连接
+        
+        退出时提交事务（异常时回滚），然后把连接归还连接池；池已满时关闭连接。
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._create_connection()
+        
+        try:
+            with conn:
+                yield conn
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+    
+    def close(self) -> None:
+        """关闭连接池中的所有连接"""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+    
     def _init_database(self) -> None:
         """初始化数据库表"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conn() as conn:
+                # WAL 模式保存在数据库文件中，只需设置一次；
+                # 之后读取抑制记录和警报历史时不会被写入操作阻塞
+                conn.execute("PRAGMA journal_mode=WAL")
+                
                 cursor = conn.cursor()
                 
                 # 创建用户订阅表
@@ -102,6 +195,22 @@ class AlertManager(IAlertManager):
                     )
                 ''')
                 
+                # 创建索引：按用户查询最近历史、按时间清理旧记录
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_history_user_sent
+                    ON alert_history(user_id, sent_at DESC)
+                ''')
+                
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_history_sent
+                    ON alert_history(sent_at)
+                ''')
+                
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_suppression_last
+                    ON alert_suppression(last_sent)
+                ''')
+                
                 conn.commit()
                 self.logger.info("警报管理器数据库初始化成功")
                 
@@ -153,17 +262,12 @@ class AlertManager(IAlertManager):
             alert: 要发送的警报
         """
         try:
-            # 检查是否应该发送此警报
-            if not self._should_send_alert_internal(user_id, alert):
+            # 检查抑制并记录发送（同一事务内完成）；
+            # 同步的 SQLite 操作放到线程中执行，避免阻塞事件循环
+            if not await asyncio.to_thread(self._try_send, user_id, alert):
                 self.logger.debug(f"跳过发送警报 (用户: {user_id}, 类型: {alert.alert_type})")
                 return
             
-            # 记录警报发送历史
-            self._record_alert_history(user_id, alert)
-            
-            # 更新警报抑制记录
-            self._update_alert_suppression(user_id, alert)
-            
             # 实际发送逻辑将在集成时实现
             # 这里只记录日志
             self.logger.info(f"发送警报给用户 {user_id}: {alert.title}")
@@ -181,7 +285,7 @@ class AlertManager(IAlertManager):
             alert_types: 要订阅的警报类型列表
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conn() as conn:
                 cursor = conn.cursor()
                 
                 # 先删除用户现有订阅
@@ -190,14 +294,14 @@ class AlertManager(IAlertManager):
                     (user_id,)
                 )
                 
-                # 添加新订阅
-                for alert_type in alert_types:
-                    cursor.execute(
-                        '''INSERT INTO user_subscriptions 
-                           (user_id, alert_type, created_at) 
-                           VALUES (?, ?, ?)''',
-                        (user_id, alert_type.value, datetime.now().isoformat())
-                    )
+                # 添加新订阅（与上面的删除在同一个事务中批量插入）
+                created_at = datetime.now().isoformat()
+                cursor.executemany(
+                    '''INSERT INTO user_subscriptions 
+                       (user_id, alert_type, created_at) 
+                       VALUES (?, ?, ?)''',
+                    [(user_id, alert_type.value, created_at) for alert_type in alert_types]
+                )
                 
                 conn.commit()
                 self.logger.info(f"用户 {user_id} 订阅了 {len(alert_types)} 种警报类型")
@@ -236,37 +340,42 @@ class AlertManager(IAlertManager):
             self.logger.error(f"判断是否发送警报时发生错误: {e}")
             return False
     
-    def _should_send_alert_internal(self, user_id: str, alert: WeatherAlert) -> bool:
-        """内部方法：检查是否应该发送警报（包含抑制逻辑）"""
+    def _try_send(self, user_id: str, alert: WeatherAlert) -> bool:
+        """
+        内部方法：检查警报抑制，允许发送时记录发送历史
+        
+        抑制判断由一条 UPSERT 完成：没有抑制记录或上次发送已超过1小时时写入本次发送时间，
+        否则不修改任何行。两条语句在同一事务中执行。
+        
+        Args:
+            user_id: 用户ID
+            alert: 要发送的警报
+            
+        Returns:
+            bool: 是否应该发送（False 表示同类型警报1小时内已发送过）
+        """
+        now = datetime.now()
+        sent_at = now.isoformat()
+        # 同类型警报至少间隔1小时
+        cutoff = (now - timedelta(hours=1)).isoformat()
+        
         try:
-            # 检查警报抑制（防止短时间内重复发送）
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    '''SELECT last_sent FROM alert_suppression 
-                       WHERE user_id = ? AND location = ? AND alert_type = ?''',
-                    (user_id, alert.location, alert.alert_type.value)
+            with self._conn() as conn:
+                cursor = conn.execute(
+                    '''INSERT INTO alert_suppression 
+                       (user_id, location, alert_type, last_sent)
+                       VALUES (?, ?, ?, ?)
+                       ON CONFLICT (user_id, location, alert_type)
+                       DO UPDATE SET last_sent = excluded.last_sent
+                       WHERE alert_suppression.last_sent <= ?''',
+                    (user_id, alert.location, alert.alert_type.value, sent_at, cutoff)
                 )
                 
-                result = cursor.fetchone()
-                if result:
-                    last_sent = datetime.fromisoformat(result[0])
-                    # 同类型警报至少间隔1小时
-                    if datetime.now() - last_sent < timedelta(hours=1):
-                        return False
-            
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"检查警报抑制时发生错误: {e}")
-            return True  # 出错时默认允许发送
-    
-    def _record_alert_history(self, user_id: str, alert: WeatherAlert) -> None:
-        """记录警报发送历史"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
+                # 没有插入或更新任何行，说明仍处于抑制期内
+                if cursor.rowcount == 0:
+                    return False
+                
+                conn.execute(
                     '''INSERT INTO alert_history 
                        (user_id, alert_type, location, title, description, 
                         severity, sent_at, start_time, end_time)
@@ -278,36 +387,17 @@ class AlertManager(IAlertManager):
                         alert.title,
                         alert.description,
                         alert.severity,
-                        datetime.now().isoformat(),
+                        sent_at,
                         alert.start_time.isoformat(),
                         alert.end_time.isoformat() if alert.end_time else None
                     )
                 )
-                conn.commit()
-                
-        except sqlite3.Error as e:
-            self.logger.error(f"记录警报历史时发生错误: {e}")
-    
-    def _update_alert_suppression(self, user_id: str, alert: WeatherAlert) -> None:
-        """更新警报抑制记录"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    '''INSERT OR REPLACE INTO alert_suppression 
-                       (user_id, location, alert_type, last_sent)
-                       VALUES (?, ?, ?, ?)''',
-                    (
-                        user_id,
-                        alert.location,
-                        alert.alert_type.value,
-                        datetime.now().isoformat()
-                    )
-                )
-                conn.commit()
-                
+            
+            return True
+            
         except sqlite3.Error as e:
-            self.logger.error(f"更新警报抑制记录时发生错误: {e}")
+            self.logger.error(f"检查警报抑制或记录警报历史时发生错误: {e}")
+            return True  # 出错时默认允许发送
     
     def get_user_subscriptions(self, user_id: str) -> List[AlertType]:
         """
@@ -320,7 +410,7 @@ class AlertManager(IAlertManager):
             List[AlertType]: 用户订阅的警报类型列表
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conn() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     'SELECT alert_type FROM user_subscriptions WHERE user_id = ?',
@@ -328,14 +418,16 @@ class AlertManager(IAlertManager):
                 )
                 
                 results = cursor.fetchall()
-                return [AlertType(row[0]) for row in results]
+                # 忽略无法识别的警报类型值
+                return [
+                    _ALERT_TYPE_BY_VALUE[row[0]]
+                    for row in results
+                    if row[0] in _ALERT_TYPE_BY_VALUE
+                ]
                 
         except sqlite3.Error as e:
             self.logger.error(f"获取用户订阅时发生错误: {e}")
             return []
-        except ValueError as e:
-            self.logger.error(f"解析警报类型时发生错误: {e}")
-            return []
     
     def get_alert_history(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -349,7 +441,7 @@ class AlertManager(IAlertManager):
             List[Dict[str, Any]]: 警报历史记录列表
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conn() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     '''SELECT alert_type, location, title, description, 
@@ -392,7 +484,7 @@ class AlertManager(IAlertManager):
         try:
             cutoff_date = datetime.now() - timedelta(days=days)
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conn() as conn:
                 cursor = conn.cursor()
                 
                 # 清理警报历史
@@ -413,11 +505,38 @@ class AlertManager(IAlertManager):
         except sqlite3.Error as e:
             self.logger.error(f"清理警报记录时发生错误: {e}")
     
+    def _text(self, message_key: str, **kwargs) -> str:
+        """
+        获取警报文案
+        
+        模板按当前语言缓存，同一消息键只查找一次本地化数据，之后只做格式化。
+        
+        Args:
+            message_key: 消息键（messages 下的相对键）
+            **kwargs: 用于格式化文本的参数
+            
+        Returns:
+            本地化后的文本
+        """
+        cache_key = (localization_manager.get_current_language(), message_key)
+        template = self._templates.get(cache_key)
+        if template is None:
+            template = localization_manager.format_message(message_key)
+            self._templates[cache_key] = template
+        
+        if not kwargs:
+            return template
+        try:
+            return template.format(**kwargs)
+        except (KeyError, ValueError, IndexError):
+            return template
+    
     def create_weather_alert(
         self,
         alert_type: AlertType,
         location: str,
         weather_data: WeatherData,
+        now: Optional[datetime] = None,
         **kwargs
     ) -> Optional[WeatherAlert]:
         """
@@ -427,20 +546,24 @@ class AlertManager(IAlertManager):
             alert_type: 警报类型
             location: 位置
             weather_data: 天气数据
+            now: 警报开始时间，批量创建警报时可传入同一时间戳，默认为当前时间
             **kwargs: 额外参数
             
         Returns:
             Optional[WeatherAlert]: 创建的警报，如果不需要警报则返回None
         """
+        if now is None:
+            now = datetime.now()
+        
         try:
             if alert_type == AlertType.SEVERE_WEATHER:
-                return self._create_severe_weather_alert(location, weather_data)
+                return self._create_severe_weather_alert(location, weather_data, now)
             elif alert_type == AlertType.TEMPERATURE_CHANGE:
-                return self._create_temperature_alert(location, weather_data, **kwargs)
+                return self._create_temperature_alert(location, weather_data, now, **kwargs)
             elif alert_type == AlertType.WIND:
-                return self._create_wind_alert(location, weather_data)
+                return self._create_wind_alert(location, weather_data, now)
             elif alert_type == AlertType.UV_INDEX:
-                return self._create_uv_alert(location, weather_data)
+                return self._create_uv_alert(location, weather_data, now)
             else:
                 return None
                 
@@ -451,46 +574,45 @@ class AlertManager(IAlertManager):
     def _create_severe_weather_alert(
         self,
         location: str,
-        weather_data: WeatherData
+        weather_data: WeatherData,
+        now: datetime
     ) -> Optional[WeatherAlert]:
         """创建恶劣天气警报"""
-        thresholds = self.alert_thresholds[AlertType.SEVERE_WEATHER]
-        
         # 检查风速
-        if weather_data.wind_speed >= thresholds['wind_speed_ms']:
+        if weather_data.wind_speed >= self.thresholds.severe_wind_ms:
             return WeatherAlert(
                 alert_type=AlertType.SEVERE_WEATHER,
-                title=localization_manager.format_message('alerts.severe_weather.high_wind_title'),
-                description=localization_manager.format_message(
+                title=self._text('alerts.severe_weather.high_wind_title'),
+                description=self._text(
                     'alerts.severe_weather.high_wind_desc',
                     wind_speed=weather_data.wind_speed,
                     location=location
                 ),
                 severity="high",
                 location=location,
-                start_time=datetime.now(),
+                start_time=now,
                 advice=[
-                    localization_manager.format_message('alerts.advice.avoid_outdoor'),
-                    localization_manager.format_message('alerts.advice.secure_objects')
+                    self._text('alerts.advice.avoid_outdoor'),
+                    self._text('alerts.advice.secure_objects')
                 ]
             )
         
         # 检查能见度
-        if weather_data.visibility <= thresholds['visibility_km']:
+        if weather_data.visibility <= self.thresholds.visibility_km:
             return WeatherAlert(
                 alert_type=AlertType.SEVERE_WEATHER,
-                title=localization_manager.format_message('alerts.severe_weather.low_visibility_title'),
-                description=localization_manager.format_message(
+                title=self._text('alerts.severe_weather.low_visibility_title'),
+                description=self._text(
                     'alerts.severe_weather.low_visibility_desc',
                     visibility=weather_data.visibility,
                     location=location
                 ),
                 severity="medium",
                 location=location,
-                start_time=datetime.now(),
+                start_time=now,
                 advice=[
-                    localization_manager.format_message('alerts.advice.drive_carefully'),
-                    localization_manager.format_message('alerts.advice.use_lights')
+                    self._text('alerts.advice.drive_carefully'),
+                    self._text('alerts.advice.use_lights')
                 ]
             )
         
@@ -500,46 +622,45 @@ class AlertManager(IAlertManager):
         self,
         location: str,
         weather_data: WeatherData,
+        now: datetime,
         **kwargs
     ) -> Optional[WeatherAlert]:
         """创建温度警报"""
-        thresholds = self.alert_thresholds[AlertType.TEMPERATURE_CHANGE]
-        
         # 检查极端高温
-        if weather_data.temperature >= thresholds['extreme_high_celsius']:
+        if weather_data.temperature >= self.thresholds.extreme_high_celsius:
             return WeatherAlert(
                 alert_type=AlertType.TEMPERATURE_CHANGE,
-                title=localization_manager.format_message('alerts.temperature.high_temp_title'),
-                description=localization_manager.format_message(
+                title=self._text('alerts.temperature.high_temp_title'),
+                description=self._text(
                     'alerts.temperature.high_temp_desc',
                     temperature=weather_data.temperature,
                     location=location
                 ),
                 severity="high",
                 location=location,
-                start_time=datetime.now(),
+                start_time=now,
                 advice=[
-                    localization_manager.format_message('alerts.advice.stay_hydrated'),
-                    localization_manager.format_message('alerts.advice.avoid_sun')
+                    self._text('alerts.advice.stay_hydrated'),
+                    self._text('alerts.advice.avoid_sun')
                 ]
             )
         
         # 检查极端低温
-        if weather_data.temperature <= thresholds['extreme_low_celsius']:
+        if weather_data.temperature <= self.thresholds.extreme_low_celsius:
             return WeatherAlert(
                 alert_type=AlertType.TEMPERATURE_CHANGE,
-                title=localization_manager.format_message('alerts.temperature.low_temp_title'),
-                description=localization_manager.format_message(
+                title=self._text('alerts.temperature.low_temp_title'),
+                description=self._text(
                     'alerts.temperature.low_temp_desc',
                     temperature=weather_data.temperature,
                     location=location
                 ),
                 severity="high",
                 location=location,
-                start_time=datetime.now(),
+                start_time=now,
                 advice=[
-                    localization_manager.format_message('alerts.advice.dress_warmly'),
-                    localization_manager.format_message('alerts.advice.avoid_prolonged_exposure')
+                    self._text('alerts.advice.dress_warmly'),
+                    self._text('alerts.advice.avoid_prolonged_exposure')
                 ]
             )
         
@@ -548,16 +669,17 @@ class AlertManager(IAlertManager):
     def _create_wind_alert(
         self,
         location: str,
-        weather_data: WeatherData
+        weather_data: WeatherData,
+        now: datetime
     ) -> Optional[WeatherAlert]:
         """创建风力警报"""
-        thresholds = self.alert_thresholds[AlertType.WIND]
+        thresholds = self.thresholds
         
-        if weather_data.wind_speed >= thresholds['gale_wind_ms']:
+        if weather_data.wind_speed >= thresholds.gale_wind_ms:
             severity = "high"
             title_key = 'alerts.wind.gale_title'
             desc_key = 'alerts.wind.gale_desc'
-        elif weather_data.wind_speed >= thresholds['strong_wind_ms']:
+        elif weather_data.wind_speed >= thresholds.strong_wind_ms:
             severity = "medium"
             title_key = 'alerts.wind.strong_title'
             desc_key = 'alerts.wind.strong_desc'
@@ -566,34 +688,35 @@ class AlertManager(IAlertManager):
         
         return WeatherAlert(
             alert_type=AlertType.WIND,
-            title=localization_manager.format_message(title_key),
-            description=localization_manager.format_message(
+            title=self._text(title_key),
+            description=self._text(
                 desc_key,
                 wind_speed=weather_data.wind_speed,
                 location=location
             ),
             severity=severity,
             location=location,
-            start_time=datetime.now(),
+            start_time=now,
             advice=[
-                localization_manager.format_message('alerts.advice.secure_objects'),
-                localization_manager.format_message('alerts.advice.avoid_outdoor')
+                self._text('alerts.advice.secure_objects'),
+                self._text('alerts.advice.avoid_outdoor')
             ]
         )
     
     def _create_uv_alert(
         self,
         location: str,
-        weather_data: WeatherData
+        weather_data: WeatherData,
+        now: datetime
     ) -> Optional[WeatherAlert]:
         """创建紫外线警报"""
-        thresholds = self.alert_thresholds[AlertType.UV_INDEX]
+        thresholds = self.thresholds
         
-        if weather_data.uv_index >= thresholds['very_high_uv']:
+        if weather_data.uv_index >= thresholds.very_high_uv:
             severity = "high"
             title_key = 'alerts.uv.very_high_title'
             desc_key = 'alerts.uv.very_high_desc'
-        elif weather_data.uv_index >= thresholds['high_uv']:
+        elif weather_data.uv_index >= thresholds.high_uv:
             severity = "medium"
             title_key = 'alerts.uv.high_title'
             desc_key = 'alerts.uv.high_desc'
@@ -602,18 +725,18 @@ class AlertManager(IAlertManager):
         
         return WeatherAlert(
             alert_type=AlertType.UV_INDEX,
-            title=localization_manager.format_message(title_key),
-            description=localization_manager.format_message(
+            title=self._text(title_key),
+            description=self._text(
                 desc_key,
                 uv_index=weather_data.uv_index,
                 location=location
             ),
             severity=severity,
             location=location,
-            start_time=datetime.now(),
+            start_time=now,
             advice=[
-                localization_manager.format_message('alerts.advice.use_sunscreen'),
-                localization_manager.format_message('alerts.advice.wear_hat'),
-                localization_manager.format_message('alerts.advice.seek_shade')
+                self._text('alerts.advice.use_sunscreen'),
+                self._text('alerts.advice.wear_hat'),
+                self._text('alerts.advice.seek_shade')
             ]
         )
\ No newline at end of file
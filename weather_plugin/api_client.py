@@ -6,14 +6,28 @@
 
 import asyncio
 import aiohttp
+import json
 import time
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时回退到标准库 json
+    orjson = None
+
 from .interfaces import IWeatherAPIClient
 from .models import APIError, ConfigurationError
 from .config import WeatherConfig
 
 
+def _loads(raw: bytes) -> Dict[str, Any]:
+    """解析 API 响应体（orjson 可用时使用 orjson）"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 class WeatherAPIClient(IWeatherAPIClient):
     """天气 API 客户端实现"""
     
@@ -47,7 +61,10 @@ class WeatherAPIClient(IWeatherAPIClient):
         """确保 HTTP 会话已创建"""
         if self.session is None or self.session.closed:
             timeout = aiohttp.ClientTimeout(total=30, connect=10)
+            # 会话在客户端生命周期内复用，保持连接并缓存 DNS 解析结果
+            connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
             self.session = aiohttp.ClientSession(
+                connector=connector,
                 timeout=timeout,
                 headers={
                     'User-Agent': f'{self.config.plugin_name}/{self.config.plugin_version}',
@@ -115,7 +132,10 @@ class WeatherAPIClient(IWeatherAPIClient):
             
             async with self.session.get(url, params=params) as response:
                 if response.status == 200:
-                    return await response.json()
+                    try:
+                        return _loads(await response.read())
+                    except ValueError as e:
+                        raise APIError(f"API 响应解析失败: {e}")
                 elif response.status == 401:
                     raise APIError("API 密钥无效或已过期")
                 elif response.status == 404:
@@ -236,6 +256,38 @@ class WeatherAPIClient(IWeatherAPIClient):
 class MockWeatherAPIClient(IWeatherAPIClient):
     """模拟天气 API 客户端（用于测试）"""
     
+    # 模拟响应中不随请求变化的部分只构建一次，各次响应共享（调用方只读取，不修改）
+    _CLEAR_WEATHER = [{"id": 800, "main": "Clear", "description": "晴朗", "icon": "01d"}]
+    _CURRENT_TEMPLATE = {
+        "coord": {"lon": 116.4074, "lat": 39.9042},
+        "weather": _CLEAR_WEATHER,
+        "base": "stations",
+        "main": {
+            "temp": 25.0,
+            "feels_like": 27.0,
+            "temp_min": 22.0,
+            "temp_max": 28.0,
+            "pressure": 1013,
+            "humidity": 60
+        },
+        "visibility": 10000,
+        "wind": {"speed": 3.5, "deg": 180},
+        "clouds": {"all": 0},
+        "sys": {"country": "CN", "sunrise": 1640995200, "sunset": 1641030000},
+        "timezone": 28800,
+        "id": 1816670,
+        "cod": 200
+    }
+    _CITY_TEMPLATE = {
+        "id": 1816670,
+        "coord": {"lat": 39.9042, "lon": 116.4074},
+        "country": "CN",
+        "population": 11716620,
+        "timezone": 28800,
+        "sunrise": 1640995200,
+        "sunset": 1641030000
+    }
+    
     def __init__(self, config: WeatherConfig):
         self.config = config
         self._request_count = 0
@@ -289,28 +341,7 @@ class MockWeatherAPIClient(IWeatherAPIClient):
         self._request_count += 1
         self._last_request_time = time.time()
         
-        return {
-            "coord": {"lon": 116.4074, "lat": 39.9042},
-            "weather": [{"id": 800, "main": "Clear", "description": "晴朗", "icon": "01d"}],
-            "base": "stations",
-            "main": {
-                "temp": 25.0,
-                "feels_like": 27.0,
-                "temp_min": 22.0,
-                "temp_max": 28.0,
-                "pressure": 1013,
-                "humidity": 60
-            },
-            "visibility": 10000,
-            "wind": {"speed": 3.5, "deg": 180},
-            "clouds": {"all": 0},
-            "dt": int(time.time()),
-            "sys": {"country": "CN", "sunrise": 1640995200, "sunset": 1641030000},
-            "timezone": 28800,
-            "id": 1816670,
-            "name": location,
-            "cod": 200
-        }
+        return {**self._CURRENT_TEMPLATE, "dt": int(time.time()), "name": location}
     
     async def fetch_forecast(self, location: str, days: int) -> Dict[str, Any]:
         """获取模拟预报数据"""
@@ -334,7 +365,7 @@ class MockWeatherAPIClient(IWeatherAPIClient):
                     "pressure": 1013 + (i % 20) - 10,
                     "humidity": 60 + (i % 40) - 20
                 },
-                "weather": [{"id": 800, "main": "Clear", "description": "晴朗", "icon": "01d"}],
+                "weather": self._CLEAR_WEATHER,
                 "clouds": {"all": i % 50},
                 "wind": {"speed": 3.5 + (i % 10) / 10, "deg": 180 + (i % 360)},
                 "visibility": 10000,
@@ -347,16 +378,7 @@ class MockWeatherAPIClient(IWeatherAPIClient):
             "message": 0,
             "cnt": len(forecast_list),
             "list": forecast_list,
-            "city": {
-                "id": 1816670,
-                "name": location,
-                "coord": {"lat": 39.9042, "lon": 116.4074},
-                "country": "CN",
-                "population": 11716620,
-                "timezone": 28800,
-                "sunrise": 1640995200,
-                "sunset": 1641030000
-            }
+            "city": {**self._CITY_TEMPLATE, "name": location}
         }
     
     async def fetch_hourly_forecast(self, location: str, hours: int) -> Dict[str, Any]:
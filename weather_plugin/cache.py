@@ -11,14 +11,33 @@ import asyncio
 import threading
 import time
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, Callable
+from typing import Optional, Dict, Any, Callable, Union
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时回退到标准库 json
+    orjson = None
+
 from .interfaces import ICacheManager
 from .models import WeatherData, ForecastData, CacheError
 from .config import WeatherConfig
 
 
+def _dumps(data: Dict[str, Any]) -> Union[bytes, str]:
+    """序列化缓存数据（orjson 可用时以 UTF-8 字节存储）"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _loads(raw: Union[bytes, str]) -> Dict[str, Any]:
+    """反序列化缓存数据，兼容旧的文本记录"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 class CacheManager(ICacheManager):
     """SQLite缓存管理器实现"""
     
@@ -34,26 +53,42 @@ class CacheManager(ICacheManager):
         self._connection: Optional[sqlite3.Connection] = None
         self._lock = asyncio.Lock()
         
+        # 表结构在首次访问数据库时才创建
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+        
         # 自动清理相关
         self._cleanup_thread: Optional[threading.Thread] = None
         self._cleanup_interval = 3600  # 1小时清理一次
         self._stop_cleanup = threading.Event()
         self._cleanup_callback: Optional[Callable[[Dict[str, Any]], None]] = None
         
-        # 确保数据库目录存在
-        db_dir = Path(self.db_path).parent
-        db_dir.mkdir(parents=True, exist_ok=True)
+        # 禁用缓存且未指定数据库时，不创建任何文件或连接
+        if self.db_path is None:
+            return
+        
+        # ":memory:" 对每个连接都是独立的空库，改用本实例专属的共享缓存内存库
+        if self.db_path == ":memory:":
+            self.db_path = f"file:weather_cache_{id(self)}?mode=memory&cache=shared"
+        self._uri = self.db_path.startswith("file:")
         
-        # 初始化数据库
-        self._init_database()
+        if self._uri:
+            # 内存库在最后一个连接关闭时销毁，保持一个连接直到 close()
+            if "mode=memory" in self.db_path:
+                self._connection = sqlite3.connect(self.db_path, uri=True, check_same_thread=False)
+        else:
+            # 确保数据库目录存在
+            db_dir = Path(self.db_path).parent
+            db_dir.mkdir(parents=True, exist_ok=True)
         
-        # 启动自动清理
-        self.start_auto_cleanup()
+        # 禁用缓存时不会写入数据，无需自动清理
+        if self.config.cache_enabled:
+            self.start_auto_cleanup()
     
     def _init_database(self) -> None:
         """初始化数据库表结构"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with sqlite3.connect(self.db_path, uri=self._uri) as conn:
                 conn.execute("""
                     CREATE TABLE IF NOT EXISTS weather_cache (
                         cache_key TEXT PRIMARY KEY,
@@ -83,11 +118,24 @@ class CacheManager(ICacheManager):
         except sqlite3.Error as e:
             raise CacheError(f"初始化数据库失败: {e}")
     
+    def _ensure_schema(self) -> None:
+        """首次使用时创建表结构"""
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if not self._schema_ready:
+                self._init_database()
+                self._schema_ready = True
+    
     def _get_connection(self) -> sqlite3.Connection:
         """获取数据库连接"""
+        if self.db_path is None:
+            raise CacheError("未配置缓存数据库路径")
+        self._ensure_schema()
         try:
             conn = sqlite3.connect(
                 self.db_path,
+                uri=self._uri,
                 check_same_thread=False,
                 timeout=30.0
             )
@@ -139,7 +187,7 @@ class CacheManager(ICacheManager):
                     conn.commit()
                     
                     # 反序列化数据
-                    data_dict = json.loads(row['data_json'])
+                    data_dict = _loads(row['data_json'])
                     return WeatherData.from_dict(data_dict)
                 
             except (sqlite3.Error, json.JSONDecodeError, ValueError) as e:
@@ -164,7 +212,7 @@ class CacheManager(ICacheManager):
                     expires_at = now + timedelta(seconds=ttl)
                     
                     # 序列化数据
-                    data_json = data.to_json()
+                    data_json = _dumps(data.to_dict())
                     
                     # 插入或更新缓存
                     conn.execute("""
@@ -178,7 +226,7 @@ class CacheManager(ICacheManager):
                     
                     conn.commit()
                 
-            except (sqlite3.Error, json.JSONEncodeError) as e:
+            except (sqlite3.Error, TypeError, ValueError) as e:
                 raise CacheError(f"缓存天气数据失败: {e}")
     
     async def get_cached_forecast(self, cache_key: str) -> Optional[ForecastData]:
@@ -224,7 +272,7 @@ class CacheManager(ICacheManager):
                     conn.commit()
                     
                     # 反序列化数据
-                    data_dict = json.loads(row['data_json'])
+                    data_dict = _loads(row['data_json'])
                     return ForecastData.from_dict(data_dict)
                 
             except (sqlite3.Error, json.JSONDecodeError, ValueError) as e:
@@ -249,7 +297,7 @@ class CacheManager(ICacheManager):
                     expires_at = now + timedelta(seconds=ttl)
                     
                     # 序列化数据
-                    data_json = data.to_json()
+                    data_json = _dumps(data.to_dict())
                     
                     # 插入或更新缓存
                     conn.execute("""
@@ -263,9 +311,72 @@ class CacheManager(ICacheManager):
                     
                     conn.commit()
                 
-            except (sqlite3.Error, json.JSONEncodeError) as e:
+            except (sqlite3.Error, TypeError, ValueError) as e:
                 raise CacheError(f"缓存预报数据失败: {e}")
     
+    def get_stale_data(self, cache_key: str, data_type: str) -> Optional[Dict[str, Any]]:
+        """
+        获取缓存数据（忽略TTL），供服务降级使用
+        
+        Args:
+            cache_key: 缓存键
+            data_type: 数据类型 ('weather', 'forecast')
+            
+        Returns:
+            反序列化后的数据字典，未配置数据库或不存在时返回None
+        """
+        if self.db_path is None:
+            return None
+        
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.execute("""
+                    SELECT data_json FROM weather_cache 
+                    WHERE cache_key = ? AND data_type = ?
+                    ORDER BY created_at DESC LIMIT 1
+                """, (cache_key, data_type))
+                
+                row = cursor.fetchone()
+                return _loads(row['data_json']) if row else None
+            
+        except (sqlite3.Error, ValueError) as e:
+            raise CacheError(f"获取过期缓存数据失败: {e}")
+    
+    def find_recent_data(
+        self, 
+        location_pattern: str, 
+        data_type: str, 
+        since: datetime
+    ) -> Optional[Dict[str, Any]]:
+        """
+        按位置模式查找最近的缓存数据（忽略TTL），供服务降级使用
+        
+        Args:
+            location_pattern: 位置 LIKE 模式
+            data_type: 数据类型 ('weather', 'forecast')
+            since: 只查找此时间之后写入的数据
+            
+        Returns:
+            反序列化后的数据字典，未配置数据库或不存在时返回None
+        """
+        if self.db_path is None:
+            return None
+        
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.execute("""
+                    SELECT data_json FROM weather_cache 
+                    WHERE location LIKE ? AND data_type = ? 
+                    AND created_at > ?
+                    ORDER BY created_at DESC LIMIT 1
+                """, (location_pattern, data_type, since.isoformat()))
+                
+                row = cursor.fetchone()
+                return _loads(row['data_json']) if row else None
+            
+        except (sqlite3.Error, ValueError) as e:
+            raise CacheError(f"查找相似位置缓存数据失败: {e}")
+    
     def generate_cache_key(self, location: str, data_type: str, **kwargs) -> str:
         """
         生成缓存键
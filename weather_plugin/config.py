@@ -4,6 +4,7 @@
 处理插件配置的加载、验证和管理。
 """
 
+import copy
 import os
 import yaml
 from typing import Dict, Any, Optional, List
@@ -21,6 +22,25 @@ class APIProviderConfig:
     rate_limits: Dict[str, int] = field(default_factory=dict)
 
 
+# 默认 API 提供商配置模板，各 WeatherConfig 实例持有其深拷贝
+_DEFAULT_PROVIDERS: Dict[str, APIProviderConfig] = {
+    "openweathermap": APIProviderConfig(
+        name="OpenWeatherMap",
+        base_url="https://api.openweathermap.org/data/2.5",
+        api_key_required=True,
+        supported_features=["current", "forecast", "hourly", "alerts"],
+        rate_limits={"per_minute": 60, "per_day": 1000}
+    ),
+    "weatherapi": APIProviderConfig(
+        name="WeatherAPI",
+        base_url="https://api.weatherapi.com/v1",
+        api_key_required=True,
+        supported_features=["current", "forecast", "hourly", "alerts", "history"],
+        rate_limits={"per_minute": 100, "per_day": 1000000}
+    )
+}
+
+
 @dataclass
 class WeatherConfig:
     """天气插件配置"""
@@ -31,7 +51,7 @@ class WeatherConfig:
     
     # 缓存配置
     cache_enabled: bool = True
-    cache_db_path: str = "weather_cache.db"
+    cache_db_path: Optional[str] = "weather_cache.db"  # 禁用缓存时可为 None
     cache_ttl_current: int = 600  # 10分钟
     cache_ttl_forecast: int = 3600  # 1小时
     cache_ttl_hourly: int = 1800  # 30分钟
@@ -58,22 +78,8 @@ class WeatherConfig:
     
     def _init_default_providers(self):
         """初始化默认 API 提供商"""
-        self.supported_providers = {
-            "openweathermap": APIProviderConfig(
-                name="OpenWeatherMap",
-                base_url="https://api.openweathermap.org/data/2.5",
-                api_key_required=True,
-                supported_features=["current", "forecast", "hourly", "alerts"],
-                rate_limits={"per_minute": 60, "per_day": 1000}
-            ),
-            "weatherapi": APIProviderConfig(
-                name="WeatherAPI",
-                base_url="https://api.weatherapi.com/v1",
-                api_key_required=True,
-                supported_features=["current", "forecast", "hourly", "alerts", "history"],
-                rate_limits={"per_minute": 100, "per_day": 1000000}
-            )
-        }
+        # 深拷贝模板，避免实例之间及与模块默认值共享嵌套的提供商配置
+        self.supported_providers = copy.deepcopy(_DEFAULT_PROVIDERS)
     
     def validate(self) -> None:
         """验证配置有效性"""
@@ -89,6 +95,9 @@ class WeatherConfig:
         if provider_config.api_key_required and not self.api_key:
             raise ConfigurationError(f"API 提供商 {self.api_provider} 需要 API 密钥")
         
+        if self.cache_enabled and not self.cache_db_path:
+            raise ConfigurationError("启用缓存时必须指定缓存数据库路径")
+        
         if self.default_units not in ["metric", "imperial"]:
             raise ConfigurationError(f"无效的默认单位: {self.default_units}")
         
@@ -89,7 +89,8 @@ class LocationService(ILocationService):
         """确保 HTTP 会话已创建"""
         if self.session is None or self.session.closed:
             timeout = aiohttp.ClientTimeout(total=10, connect=5)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+            connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
     
     async def close(self):
         """关闭 HTTP 会话"""
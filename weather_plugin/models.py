@@ -5,12 +5,35 @@
 命令类型和其他核心数据类型。
 """
 
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
 from datetime import datetime, date
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, FrozenSet, Tuple
 from enum import Enum
+from functools import lru_cache
 import json
 
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时回退到标准库 json
+    orjson = None
+
+
+def _dumps(data: Dict[str, Any]) -> str:
+    """序列化为 JSON 字符串（orjson 可用时使用 orjson）"""
+    if orjson is not None:
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data, ensure_ascii=False)
+
+
+@lru_cache(maxsize=None)
+def _field_names(cls: type) -> tuple:
+    """数据类字段名，按类缓存以避免每次序列化都重新反射"""
+    return tuple(f.name for f in fields(cls))
+
+
+# 获取当前时间，测试中可替换为假时钟
+_now = datetime.now
+
 
 class CommandType(Enum):
     """命令类型枚举"""
@@ -41,6 +64,17 @@ class Season(Enum):
     WINTER = "winter"
 
 
+class WeatherCategory(Enum):
+    """活动推荐使用的天气分类枚举"""
+    THUNDERSTORM = "雷暴"
+    RAIN = "雨天"
+    SNOW = "雪天"
+    HAZE = "雾霾"
+    SUNNY = "晴天"
+    PARTLY_CLOUDY = "多云"
+    OVERCAST = "阴天"
+
+
 @dataclass
 class Coordinates:
     """地理坐标"""
@@ -55,7 +89,7 @@ class Coordinates:
             raise ValueError(f"经度必须在 -180 到 180 之间，得到: {self.longitude}")
 
 
-@dataclass
+@dataclass(slots=True)
 class LocationInfo:
     """位置信息"""
     name: str
@@ -64,7 +98,7 @@ class LocationInfo:
     region: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class WeatherData:
     """天气数据模型"""
     location: str
@@ -92,7 +126,7 @@ class WeatherData:
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
-        data = asdict(self)
+        data = {name: getattr(self, name) for name in _field_names(type(self))}
         data['timestamp'] = self.timestamp.isoformat()
         return data
     
@@ -106,10 +140,10 @@ class WeatherData:
     
     def to_json(self) -> str:
         """转换为JSON字符串"""
-        return json.dumps(self.to_dict(), ensure_ascii=False)
+        return _dumps(self.to_dict())
 
 
-@dataclass
+@dataclass(slots=True)
 class ForecastDay:
     """单日预报数据"""
     date: date
@@ -129,7 +163,7 @@ class ForecastDay:
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
-        data = asdict(self)
+        data = {name: getattr(self, name) for name in _field_names(type(self))}
         data['date'] = self.date.isoformat()
         return data
     
@@ -142,7 +176,7 @@ class ForecastDay:
         return cls(**data)
 
 
-@dataclass
+@dataclass(slots=True)
 class ForecastData:
     """预报数据模型"""
     location: str
@@ -170,10 +204,10 @@ class ForecastData:
     
     def to_json(self) -> str:
         """转换为JSON字符串"""
-        return json.dumps(self.to_dict(), ensure_ascii=False)
+        return _dumps(self.to_dict())
 
 
-@dataclass
+@dataclass(slots=True)
 class HourlyForecastData:
     """小时预报数据模型"""
     location: str
@@ -182,7 +216,7 @@ class HourlyForecastData:
     generated_at: datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class UserPrefs:
     """用户偏好设置"""
     user_id: str
@@ -198,9 +232,9 @@ class UserPrefs:
         if self.alert_subscriptions is None:
             self.alert_subscriptions = []
         if self.created_at is None:
-            self.created_at = datetime.now()
+            self.created_at = _now()
         if self.updated_at is None:
-            self.updated_at = datetime.now()
+            self.updated_at = _now()
         
         # 验证单位
         if self.units not in ["metric", "imperial"]:
@@ -232,31 +266,35 @@ class UserPrefs:
     
     def to_json(self) -> str:
         """转换为JSON字符串"""
-        return json.dumps(self.to_dict(), ensure_ascii=False)
+        return _dumps(self.to_dict())
+    
+    def touch(self) -> None:
+        """刷新更新时间"""
+        self.updated_at = _now()
     
     def update_location(self, location: str) -> None:
         """更新默认位置"""
         self.default_location = location
-        self.updated_at = datetime.now()
+        self.updated_at = _now()
     
     def update_units(self, units: str) -> None:
         """更新单位偏好"""
         if units not in ["metric", "imperial"]:
             raise ValueError(f"单位必须是 'metric' 或 'imperial'，得到: {units}")
         self.units = units
-        self.updated_at = datetime.now()
+        self.updated_at = _now()
     
     def add_alert_subscription(self, alert_type: AlertType) -> None:
         """添加警报订阅"""
         if alert_type not in self.alert_subscriptions:
             self.alert_subscriptions.append(alert_type)
-            self.updated_at = datetime.now()
+            self.updated_at = _now()
     
     def remove_alert_subscription(self, alert_type: AlertType) -> None:
         """移除警报订阅"""
         if alert_type in self.alert_subscriptions:
             self.alert_subscriptions.remove(alert_type)
-            self.updated_at = datetime.now()
+            self.updated_at = _now()
 
 
 @dataclass
@@ -291,21 +329,25 @@ class WeatherAlert:
             self.advice = []
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Activity:
-    """活动推荐模型"""
+    """活动推荐模型（不可变，可哈希，推荐结果缓存中的实例会被多次返回）"""
     name: str
     description: str
     category: str
-    suitable_weather: List[str]
+    suitable_weather: FrozenSet[WeatherCategory]
     season: Optional[Season] = None
     indoor: bool = False
-    safety_notes: List[str] = None
+    safety_notes: Tuple[str, ...] = ()
     
     def __post_init__(self):
-        """初始化默认值"""
-        if self.safety_notes is None:
-            self.safety_notes = []
+        """规范化字段类型"""
+        # 固定为 frozenset，分类判断为常数时间的集合查找；兼容旧的中文标签，未知标签抛出 ValueError
+        object.__setattr__(
+            self, 'suitable_weather',
+            frozenset(WeatherCategory(w) for w in self.suitable_weather)
+        )
+        object.__setattr__(self, 'safety_notes', tuple(self.safety_notes or ()))
 
 
 class WeatherError(Exception):
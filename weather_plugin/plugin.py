@@ -201,6 +201,9 @@ class WeatherPlugin(IWeatherPlugin):
             if hasattr(self, 'cache_manager'):
                 self.cache_manager.close()
             
+            if hasattr(self, 'alert_manager'):
+                self.alert_manager.close()
+            
             if hasattr(self, 'api_client'):
                 import asyncio
                 try:
@@ -802,6 +805,10 @@ class WeatherPlugin(IWeatherPlugin):
             if hasattr(self, 'cache_manager'):
                 self.cache_manager.close()
             
+            # 关闭警报管理器的数据库连接
+            if hasattr(self, 'alert_manager'):
+                self.alert_manager.close()
+            
             # 关闭API客户端
             if hasattr(self, 'api_client'):
                 import asyncio
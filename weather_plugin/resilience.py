@@ -0,0 +1,139 @@
+"""
+弹性调用执行器
+
+在单个协程中完成超时控制、断路器检查和重试，减少每次 API 调用的嵌套层数。
+每次尝试单独限时，超时计为断路器失败并参与重试；总超时作为所有尝试的上限。
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+
+from .models import APIError
+
+try:
+    from asyncio import timeout as _timeout
+except ImportError:  # Python 3.11 之前没有 asyncio.timeout，不限制总时长
+    _timeout = None
+
+
+class ResilienceProfile(NamedTuple):
+    """弹性调用配置"""
+    timeout: Optional[float]  # 包含重试在内的总超时（秒），None 表示不限制
+    max_retries: int          # 最大重试次数
+    retry_delay: float        # 首次重试延迟（秒），之后指数退避
+    attempt_timeout: Optional[float] = None  # 单次尝试超时（秒），None 表示只受总超时限制
+
+
+# 外部天气 API 调用使用的配置
+API_PROFILE = ResilienceProfile(timeout=30.0, max_retries=2, retry_delay=1.0, attempt_timeout=10.0)
+
+# 这些错误重试也不会成功，直接抛出
+_NON_RETRYABLE_ERRORS = (
+    'invalid', '404', 'not found', 'unauthorized', '401',
+    'forbidden', '403', 'bad request', '400', 'quota',
+    'limit exceeded', 'api key'
+)
+
+
+class ResilientExecutor:
+    """通过断路器执行调用，并负责重试和总超时"""
+
+    def __init__(self, circuit_breaker):
+        """
+        初始化执行器
+
+        Args:
+            circuit_breaker: 断路器，需提供 call(func, *args) 协程方法
+        """
+        self.circuit_breaker = circuit_breaker
+        self.logger = logging.getLogger(__name__)
+
+    async def execute(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        profile: ResilienceProfile = API_PROFILE
+    ) -> Any:
+        """
+        执行调用
+
+        Args:
+            func: 要调用的协程函数
+            *args: 函数参数
+            profile: 弹性调用配置
+
+        Returns:
+            函数调用结果
+
+        Raises:
+            APIError: 调用最终失败或超时
+        """
+        max_retries = profile.max_retries
+        retry_delay = profile.retry_delay
+        last_error = None
+
+        loop = asyncio.get_running_loop()
+        deadline = None if profile.timeout is None else loop.time() + profile.timeout
+
+        for attempt in range(max_retries + 1):
+            limit = profile.attempt_timeout
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise APIError(f"API调用超时 (timeout {profile.timeout}s)")
+                limit = remaining if limit is None else min(limit, remaining)
+
+            try:
+                return await self.circuit_breaker.call(self._attempt, func, args, limit)
+            except APIError as e:
+                last_error = e
+                error_msg = str(e).lower()
+
+                if any(keyword in error_msg for keyword in _NON_RETRYABLE_ERRORS):
+                    self.logger.info(f"不可重试的错误，直接抛出: {e}")
+                    raise e
+
+                if attempt < max_retries:
+                    # 根据错误类型调整重试延迟
+                    if "rate limit" in error_msg or "429" in error_msg:
+                        # 速率限制错误，使用更长的延迟
+                        actual_delay = retry_delay * 3
+                    elif "500" in error_msg or "502" in error_msg or "503" in error_msg:
+                        # 服务器错误，使用较长延迟
+                        actual_delay = retry_delay * 2
+                    else:
+                        actual_delay = retry_delay
+
+                    if deadline is not None and loop.time() + actual_delay >= deadline:
+                        # 等待后已无剩余时间，不再重试
+                        self.logger.error(f"API调用失败，总超时内无法再次重试: {e}")
+                        raise e
+
+                    self.logger.warning(f"API调用失败，{actual_delay}秒后重试 (尝试 {attempt + 1}/{max_retries + 1}): {e}")
+                    await asyncio.sleep(actual_delay)
+                    retry_delay *= 1.5  # 指数退避
+                else:
+                    self.logger.error(f"API调用最终失败，已重试 {max_retries} 次: {e}")
+
+        raise last_error or APIError("API调用失败")
+
+    @staticmethod
+    async def _attempt(func, args, limit: Optional[float]) -> Any:
+        """
+        限时执行单次调用
+
+        超时在断路器内部转换为 APIError，从而计入失败次数；
+        被调用函数自身抛出的 TimeoutError 原样抛出。
+        """
+        if limit is None or _timeout is None:
+            return await func(*args)
+
+        cm = _timeout(limit)
+        try:
+            async with cm:
+                return await func(*args)
+        except TimeoutError:
+            if cm.expired():
+                raise APIError(f"API调用超时 (timeout {limit:.1f}s)")
+            raise
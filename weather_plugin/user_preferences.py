@@ -6,7 +6,8 @@
 
 import sqlite3
 import json
-from typing import List, Optional, Dict, Any
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Dict, Any
 from pathlib import Path
 from datetime import datetime
 
@@ -14,6 +15,21 @@ from .interfaces import IUserPreferences
 from .models import UserPrefs, AlertType
 
 
+class _DeferredCommitConnection(sqlite3.Connection):
+    """事务期间共享的连接：deferred 为真时忽略单次操作的提交，由 transaction() 统一提交或回滚"""
+    
+    deferred = True
+    
+    def commit(self) -> None:
+        if not self.deferred:
+            super().commit()
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if not self.deferred:
+            return super().__exit__(exc_type, exc_value, traceback)
+        return False
+
+
 class UserPreferences(IUserPreferences):
     """用户偏好管理器"""
     
@@ -25,11 +41,74 @@ class UserPreferences(IUserPreferences):
             db_path: SQLite数据库文件路径
         """
         self.db_path = Path(db_path)
+        # 支持 "file:...?mode=memory&cache=shared" 形式的 URI，可与缓存共享同一内存库
+        self._uri = str(db_path).startswith("file:")
+        # 内存数据库只在连接存在期间保留，需要复用同一连接
+        self._memory_conn: Optional[sqlite3.Connection] = None
+        self._transaction_conn: Optional[sqlite3.Connection] = None
+        if str(db_path) == ":memory:" or (self._uri and "mode=memory" in str(db_path)):
+            self._memory_conn = self._open_connection(
+                check_same_thread=False, factory=_DeferredCommitConnection
+            )
+            # 事务外按普通连接提交，transaction() 期间改为延迟提交
+            self._memory_conn.deferred = False
         self._init_database()
     
+    def _open_connection(self, **kwargs: Any) -> sqlite3.Connection:
+        """新建数据库连接"""
+        return sqlite3.connect(str(self.db_path), uri=self._uri, **kwargs)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """获取数据库连接，事务期间返回事务连接"""
+        if self._transaction_conn is not None:
+            return self._transaction_conn
+        if self._memory_conn is not None:
+            return self._memory_conn
+        return self._open_connection()
+    
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        在同一连接和事务中执行多次读写，退出时统一提交，出错时回滚
+        
+        嵌套调用直接复用当前事务；内存数据库复用同一连接，通过 SAVEPOINT 保证原子性。
+        """
+        if self._transaction_conn is not None:
+            yield
+            return
+        
+        if self._memory_conn is not None:
+            conn = self._memory_conn
+            conn.deferred = True
+            self._transaction_conn = conn
+            conn.execute("SAVEPOINT user_prefs_transaction")
+            try:
+                yield
+                conn.execute("RELEASE SAVEPOINT user_prefs_transaction")
+            except BaseException:
+                conn.execute("ROLLBACK TO SAVEPOINT user_prefs_transaction")
+                conn.execute("RELEASE SAVEPOINT user_prefs_transaction")
+                raise
+            finally:
+                self._transaction_conn = None
+                conn.deferred = False
+            return
+        
+        conn = self._open_connection(factory=_DeferredCommitConnection)
+        self._transaction_conn = conn
+        try:
+            yield
+            sqlite3.Connection.commit(conn)
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._transaction_conn = None
+            conn.close()
+    
     def _init_database(self) -> None:
         """初始化数据库表"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS user_preferences (
                     user_id TEXT PRIMARY KEY,
@@ -53,7 +132,7 @@ class UserPreferences(IUserPreferences):
         Returns:
             用户偏好对象，如果不存在则创建默认偏好
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute(
                 "SELECT * FROM user_preferences WHERE user_id = ?",
@@ -110,7 +189,7 @@ class UserPreferences(IUserPreferences):
         # 序列化警报订阅
         alert_subscriptions_json = json.dumps([alert.value for alert in prefs.alert_subscriptions])
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.execute("""
                 INSERT OR REPLACE INTO user_preferences 
                 (user_id, default_location, units, alert_subscriptions, language, created_at, updated_at)
@@ -173,7 +252,7 @@ class UserPreferences(IUserPreferences):
         """
         prefs = self.get_user_preferences(user_id)
         prefs.alert_subscriptions = alert_types
-        prefs.updated_at = datetime.now()
+        prefs.touch()
         self._save_preferences(prefs)
     
     def add_alert_subscription(self, user_id: str, alert_type: AlertType) -> None:
@@ -210,7 +289,7 @@ class UserPreferences(IUserPreferences):
         """
         prefs = self.get_user_preferences(user_id)
         prefs.language = language
-        prefs.updated_at = datetime.now()
+        prefs.touch()
         self._save_preferences(prefs)
     
     def delete_user_preferences(self, user_id: str) -> bool:
@@ -223,7 +302,7 @@ class UserPreferences(IUserPreferences):
         Returns:
             是否成功删除
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute(
                 "DELETE FROM user_preferences WHERE user_id = ?",
                 (user_id,)
@@ -238,12 +317,18 @@ class UserPreferences(IUserPreferences):
         Returns:
             用户ID列表
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute("SELECT user_id FROM user_preferences")
             return [row[0] for row in cursor.fetchall()]
     
     def cleanup_database(self) -> None:
         """清理数据库（用于测试）"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.execute("DELETE FROM user_preferences")
-            conn.commit()
\ No newline at end of file
+            conn.commit()
+    
+    def close(self) -> None:
+        """关闭内存数据库的持久连接（文件数据库按操作开关连接，无需关闭）"""
+        if self._memory_conn is not None:
+            self._memory_conn.close()
+            self._memory_conn = None
\ No newline at end of file
@@ -6,6 +6,7 @@
 
 import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 from enum import Enum
@@ -16,6 +17,7 @@ from .models import (
     APIError, LocationError, CacheError, WeatherError
 )
 from .config import WeatherConfig
+from .resilience import ResilientExecutor
 
 
 class CircuitBreakerState(Enum):
@@ -25,22 +27,61 @@ class CircuitBreakerState(Enum):
     HALF_OPEN = "half_open"  # 半开状态（尝试恢复）
 
 
+# 断路器热路径上使用的状态常量，避免每次调用都查找枚举属性
+_CLOSED = CircuitBreakerState.CLOSED
+_OPEN = CircuitBreakerState.OPEN
+_HALF_OPEN = CircuitBreakerState.HALF_OPEN
+
+# 友好错误消息模板，按需填入位置，避免每次调用都格式化全部消息
+_ERR_TEMPLATES = {
+    "api_unavailable": "抱歉，天气服务暂时不可用。请稍后重试查询 {location} 的天气。我们正在努力恢复服务。",
+    "location_not_found": "未找到位置 '{location}'，请检查拼写或尝试使用更具体的地名（如：北京市、上海市浦东新区）。",
+    "rate_limit": "请求过于频繁，请稍后再试。为了保证服务质量，我们限制了查询频率。",
+    "network_error": "网络连接出现问题，请检查网络连接后重试。如果问题持续存在，请联系管理员。",
+    "service_error": "天气服务出现错误，无法获取 {location} 的天气信息。请稍后重试或联系技术支持。",
+    "invalid_location": "位置 '{location}' 无效，请提供有效的城市名称或坐标（如：北京、上海、40.7128,-74.0060）。",
+    "data_error": "天气数据格式错误，我们已记录此问题并正在修复。请稍后重试。",
+    "timeout_error": "获取 {location} 天气信息超时，请检查网络连接或稍后重试。",
+    "auth_error": "API认证失败，请检查配置或联系管理员。",
+    "quota_exceeded": "今日查询次数已达上限，请明天再试或升级服务计划。",
+    "maintenance": "天气服务正在维护中，预计很快恢复。感谢您的耐心等待。",
+    "invalid_api_key": "API密钥无效或已过期，请联系管理员更新配置。",
+    "server_error": "天气服务器出现内部错误，无法处理 {location} 的请求。我们已收到错误报告。"
+}
+_ERR_DEFAULT = "获取 {location} 天气信息时发生未知错误，请稍后重试。如问题持续，请联系技术支持。"
+
+
 class CircuitBreaker:
     """断路器模式实现"""
     
-    def __init__(self, failure_threshold: int = 5, recovery_timeout: int = 60):
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: int = 60,
+        half_open_max_calls: int = 1,
+        max_concurrent: int = 20
+    ):
         """
         初始化断路器
         
         Args:
             failure_threshold: 失败阈值
             recovery_timeout: 恢复超时时间（秒）
+            half_open_max_calls: 半开状态下允许同时进行的探测调用数
+            max_concurrent: 允许同时进行的调用数（舱壁隔离），超出时立即失败
         """
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
         self.failure_count = 0
         self.last_failure_time = None
-        self.state = CircuitBreakerState.CLOSED
+        self.state = _CLOSED
+        # 最近一次断开的时间点（单调时钟），只在状态切换为 OPEN 时更新
+        self._opened_at = 0.0
+        # 半开探测与舱壁隔离均不排队等待，已满时直接快速失败
+        self._half_open_sem = asyncio.Semaphore(half_open_max_calls)
+        self._bulkhead = asyncio.Semaphore(max_concurrent)
+        # 单调时钟（与默认事件循环的 loop.time() 相同），绑定为实例属性以减少查找并便于测试替换
+        self._now = time.monotonic
     
     async def call(self, func, *args, **kwargs):
         """
@@ -54,12 +95,26 @@ class CircuitBreaker:
         Returns:
             函数调用结果
         """
-        if self.state == CircuitBreakerState.OPEN:
-            if self._should_attempt_reset():
-                self.state = CircuitBreakerState.HALF_OPEN
-            else:
-                raise APIError("服务暂时不可用（断路器开启）")
+        if self._bulkhead.locked():
+            raise APIError("服务繁忙，请稍后重试（并发请求已达上限）")
         
+        async with self._bulkhead:
+            if self.state is _OPEN:
+                if self._now() - self._opened_at < self.recovery_timeout:
+                    raise APIError("服务暂时不可用（断路器开启）")
+                self.state = _HALF_OPEN
+            
+            if self.state is _HALF_OPEN:
+                # 恢复期间只放行有限的探测调用，其余调用快速失败，避免同时冲击后端
+                if self._half_open_sem.locked():
+                    raise APIError("服务暂时不可用（断路器正在尝试恢复）")
+                async with self._half_open_sem:
+                    return await self._invoke(func, args, kwargs)
+            
+            return await self._invoke(func, args, kwargs)
+    
+    async def _invoke(self, func, args, kwargs):
+        """调用函数并根据结果更新断路器状态"""
         try:
             result = await func(*args, **kwargs)
             self._on_success()
@@ -68,24 +123,20 @@ class CircuitBreaker:
             self._on_failure()
             raise e
     
-    def _should_attempt_reset(self) -> bool:
-        """检查是否应该尝试重置断路器"""
-        if self.last_failure_time is None:
-            return True
-        return (datetime.now() - self.last_failure_time).total_seconds() > self.recovery_timeout
-    
     def _on_success(self):
         """成功调用时的处理"""
         self.failure_count = 0
-        self.state = CircuitBreakerState.CLOSED
+        self.state = _CLOSED
     
     def _on_failure(self):
         """失败调用时的处理"""
         self.failure_count += 1
-        self.last_failure_time = datetime.now()
+        self.last_failure_time = self._now()
         
-        if self.failure_count >= self.failure_threshold:
-            self.state = CircuitBreakerState.OPEN
+        # 半开探测失败时立即重新断开
+        if self.state is _HALF_OPEN or self.failure_count >= self.failure_threshold:
+            self.state = _OPEN
+            self._opened_at = self.last_failure_time
 
 
 class WeatherService(IWeatherService):
@@ -119,8 +170,11 @@ class WeatherService(IWeatherService):
         # 初始化断路器
         self.circuit_breaker = CircuitBreaker(
             failure_threshold=config.api_failure_threshold if hasattr(config, 'api_failure_threshold') else 5,
-            recovery_timeout=config.api_recovery_timeout if hasattr(config, 'api_recovery_timeout') else 60
+            recovery_timeout=config.api_recovery_timeout if hasattr(config, 'api_recovery_timeout') else 60,
+            max_concurrent=config.api_max_concurrent if hasattr(config, 'api_max_concurrent') else 20
         )
+        # 断路器、重试和总超时由同一个执行器处理
+        self.executor = ResilientExecutor(self.circuit_breaker)
     
     async def get_current_weather(self, location: str, user_id: str) -> WeatherData:
         """
@@ -147,7 +201,7 @@ class WeatherService(IWeatherService):
             user_prefs = self.user_preferences.get_user_preferences(user_id)
             units = user_prefs.units
             
-            # 生成缓存键
+            # 生成缓存键（依赖标准化位置和用户单位，因此上述步骤需在缓存查询前依次完成）
             cache_key = self.cache_manager.generate_cache_key(
                 normalized_location, 
                 'weather',
@@ -164,13 +218,10 @@ class WeatherService(IWeatherService):
             self.logger.debug(f"从API获取天气数据: {normalized_location}")
             
             # 使用断路器和重试机制获取数据
-            async def api_call():
-                return await self.circuit_breaker.call(
-                    self.api_client.fetch_current_weather, 
-                    normalized_location
-                )
-            
-            raw_data = await self._handle_api_error_with_retry(api_call)
+            raw_data = await self.executor.execute(
+                self.api_client.fetch_current_weather,
+                normalized_location
+            )
             
             # 转换为标准格式
             weather_data = self._convert_current_weather_data(raw_data, normalized_location, units)
@@ -280,14 +331,11 @@ class WeatherService(IWeatherService):
             self.logger.debug(f"从API获取预报数据: {normalized_location}, {days}天")
             
             # 使用断路器和重试机制获取数据
-            async def api_call():
-                return await self.circuit_breaker.call(
-                    self.api_client.fetch_forecast, 
-                    normalized_location, 
-                    days
-                )
-            
-            raw_data = await self._handle_api_error_with_retry(api_call)
+            raw_data = await self.executor.execute(
+                self.api_client.fetch_forecast,
+                normalized_location,
+                days
+            )
             
             # 转换为标准格式
             forecast_data = self._convert_forecast_data(raw_data, normalized_location, days, units)
@@ -389,17 +437,15 @@ class WeatherService(IWeatherService):
             self.logger.debug(f"从API获取小时预报数据: {normalized_location}, {hours}小时")
             
             # 使用断路器和重试机制获取数据
-            async def api_call():
-                return await self.circuit_breaker.call(
-                    self.api_client.fetch_hourly_forecast, 
-                    normalized_location, 
-                    hours
-                )
-            
-            raw_data = await self._handle_api_error_with_retry(api_call)
+            raw_data = await self.executor.execute(
+                self.api_client.fetch_hourly_forecast,
+                normalized_location,
+                hours
+            )
             
             # 转换为标准格式
             hourly_data = self._convert_hourly_forecast_data(raw_data, normalized_location, hours, units)
+            self._sanitize_hourly_batch(hourly_data.hours, units)
             
             return hourly_data
             
@@ -513,32 +559,14 @@ class WeatherService(IWeatherService):
             过期的缓存数据或None
         """
         try:
-            # 这里需要直接访问数据库，绕过TTL检查
-            # 由于当前缓存管理器不支持此功能，我们实现一个简单版本
-            import sqlite3
-            import json
-            from datetime import datetime
+            # 通过缓存管理器直接读取数据库，绕过TTL检查
+            data_dict = self.cache_manager.get_stale_data(cache_key, data_type)
+            if data_dict:
+                if data_type == 'weather':
+                    return WeatherData.from_dict(data_dict)
+                elif data_type == 'forecast':
+                    return ForecastData.from_dict(data_dict)
             
-            try:
-                with sqlite3.connect(self.config.cache_db_path) as conn:
-                    conn.row_factory = sqlite3.Row
-                    cursor = conn.execute("""
-                        SELECT data_json FROM weather_cache 
-                        WHERE cache_key = ? AND data_type = ?
-                        ORDER BY created_at DESC LIMIT 1
-                    """, (cache_key, data_type))
-                    
-                    row = cursor.fetchone()
-                    if row:
-                        data_dict = json.loads(row['data_json'])
-                        if data_type == 'weather':
-                            return WeatherData.from_dict(data_dict)
-                        elif data_type == 'forecast':
-                            return ForecastData.from_dict(data_dict)
-                        
-            except Exception as db_error:
-                self.logger.debug(f"无法访问过期缓存: {db_error}")
-                
             return None
             
         except Exception as e:
@@ -565,8 +593,6 @@ class WeatherService(IWeatherService):
             相似位置的缓存数据或None
         """
         try:
-            import sqlite3
-            import json
             from datetime import datetime, timedelta
             
             # 定义相似位置的搜索模式
@@ -578,34 +604,19 @@ class WeatherService(IWeatherService):
             # 只查找最近24小时内的数据
             cutoff_time = datetime.now() - timedelta(hours=24)
             
-            try:
-                with sqlite3.connect(self.config.cache_db_path) as conn:
-                    conn.row_factory = sqlite3.Row
-                    
-                    for pattern in similar_patterns:
-                        cursor = conn.execute("""
-                            SELECT data_json, cache_key FROM weather_cache 
-                            WHERE cache_key LIKE ? AND data_type = ? 
-                            AND created_at > ?
-                            ORDER BY created_at DESC LIMIT 1
-                        """, (pattern, data_type, cutoff_time.isoformat()))
-                        
-                        row = cursor.fetchone()
-                        if row:
-                            data_dict = json.loads(row['data_json'])
-                            if data_type == 'weather':
-                                data = WeatherData.from_dict(data_dict)
-                                # 更新位置信息为目标位置
-                                data.location = location
-                                return data
-                            elif data_type == 'forecast':
-                                data = ForecastData.from_dict(data_dict)
-                                data.location = location
-                                return data
-                        
-            except Exception as db_error:
-                self.logger.debug(f"无法访问相似位置缓存: {db_error}")
-                
+            for pattern in similar_patterns:
+                data_dict = self.cache_manager.find_recent_data(pattern, data_type, cutoff_time)
+                if data_dict:
+                    if data_type == 'weather':
+                        data = WeatherData.from_dict(data_dict)
+                    elif data_type == 'forecast':
+                        data = ForecastData.from_dict(data_dict)
+                    else:
+                        continue
+                    # 更新位置信息为目标位置
+                    data.location = location
+                    return data
+            
             return None
             
         except Exception as e:
@@ -684,82 +695,7 @@ class WeatherService(IWeatherService):
         Returns:
             友好的错误消息
         """
-        error_messages = {
-            "api_unavailable": f"抱歉，天气服务暂时不可用。请稍后重试查询 {location} 的天气。我们正在努力恢复服务。",
-            "location_not_found": f"未找到位置 '{location}'，请检查拼写或尝试使用更具体的地名（如：北京市、上海市浦东新区）。",
-            "rate_limit": "请求过于频繁，请稍后再试。为了保证服务质量，我们限制了查询频率。",
-            "network_error": "网络连接出现问题，请检查网络连接后重试。如果问题持续存在，请联系管理员。",
-            "service_error": f"天气服务出现错误，无法获取 {location} 的天气信息。请稍后重试或联系技术支持。",
-            "invalid_location": f"位置 '{location}' 无效，请提供有效的城市名称或坐标（如：北京、上海、40.7128,-74.0060）。",
-            "data_error": "天气数据格式错误，我们已记录此问题并正在修复。请稍后重试。",
-            "timeout_error": f"获取 {location} 天气信息超时，请检查网络连接或稍后重试。",
-            "auth_error": "API认证失败，请检查配置或联系管理员。",
-            "quota_exceeded": "今日查询次数已达上限，请明天再试或升级服务计划。",
-            "maintenance": "天气服务正在维护中，预计很快恢复。感谢您的耐心等待。",
-            "invalid_api_key": "API密钥无效或已过期，请联系管理员更新配置。",
-            "server_error": f"天气服务器出现内部错误，无法处理 {location} 的请求。我们已收到错误报告。"
-        }
-        
-        return error_messages.get(error_type, f"获取 {location} 天气信息时发生未知错误，请稍后重试。如问题持续，请联系技术支持。")
-    
-    async def _handle_api_error_with_retry(
-        self, 
-        api_call, 
-        max_retries: int = 2, 
-        retry_delay: float = 1.0
-    ):
-        """
-        带重试机制的API调用处理
-        
-        Args:
-            api_call: API调用函数
-            max_retries: 最大重试次数
-            retry_delay: 重试延迟（秒）
-            
-        Returns:
-            API调用结果
-        """
-        last_error = None
-        
-        for attempt in range(max_retries + 1):
-            try:
-                return await api_call()
-            except APIError as e:
-                last_error = e
-                error_msg = str(e).lower()
-                
-                # 对于某些错误类型不进行重试
-                non_retryable_errors = [
-                    'invalid', '404', 'not found', 'unauthorized', '401',
-                    'forbidden', '403', 'bad request', '400', 'quota',
-                    'limit exceeded', 'api key'
-                ]
-                
-                if any(keyword in error_msg for keyword in non_retryable_errors):
-                    self.logger.info(f"不可重试的错误，直接抛出: {e}")
-                    raise e
-                
-                if attempt < max_retries:
-                    # 根据错误类型调整重试延迟
-                    if "rate limit" in error_msg or "429" in error_msg:
-                        # 速率限制错误，使用更长的延迟
-                        actual_delay = retry_delay * 3
-                    elif "timeout" in error_msg or "network" in error_msg:
-                        # 网络错误，使用标准延迟
-                        actual_delay = retry_delay
-                    elif "500" in error_msg or "502" in error_msg or "503" in error_msg:
-                        # 服务器错误，使用较长延迟
-                        actual_delay = retry_delay * 2
-                    else:
-                        actual_delay = retry_delay
-                    
-                    self.logger.warning(f"API调用失败，{actual_delay}秒后重试 (尝试 {attempt + 1}/{max_retries + 1}): {e}")
-                    await asyncio.sleep(actual_delay)
-                    retry_delay *= 1.5  # 指数退避
-                else:
-                    self.logger.error(f"API调用最终失败，已重试 {max_retries} 次: {e}")
-        
-        raise last_error or APIError("API调用失败")
+        return _ERR_TEMPLATES.get(error_type, _ERR_DEFAULT).format(location=location)
     
     def _validate_weather_data(self, data: WeatherData) -> bool:
         """
@@ -772,6 +708,7 @@ class WeatherService(IWeatherService):
             数据是否有效
         """
         try:
+            # 按最常见的异常字段排序，首个不合理的字段即返回
             # 检查温度范围（-100°C 到 60°C）
             if not (-100 <= data.temperature <= 60):
                 self.logger.warning(f"温度数据异常: {data.temperature}°C")
@@ -783,7 +720,7 @@ class WeatherService(IWeatherService):
                 return False
             
             # 检查风速（不能为负数，且不应超过500 km/h）
-            if data.wind_speed < 0 or data.wind_speed > 500:
+            if not (0 <= data.wind_speed <= 500):
                 self.logger.warning(f"风速数据异常: {data.wind_speed}")
                 return False
             
@@ -814,26 +751,11 @@ class WeatherService(IWeatherService):
             清理后的天气数据
         """
         try:
-            # 修正异常值
-            if data.temperature < -100:
-                data.temperature = -100
-            elif data.temperature > 60:
-                data.temperature = 60
-            
-            if data.humidity < 0:
-                data.humidity = 0
-            elif data.humidity > 100:
-                data.humidity = 100
-            
-            if data.wind_speed < 0:
-                data.wind_speed = 0
-            elif data.wind_speed > 500:
-                data.wind_speed = 500
-            
-            if data.pressure < 800:
-                data.pressure = 800
-            elif data.pressure > 1100:
-                data.pressure = 1100
+            # 将异常值截断到合理范围
+            data.temperature = min(max(data.temperature, -100), 60)
+            data.humidity = min(max(data.humidity, 0), 100)
+            data.wind_speed = min(max(data.wind_speed, 0), 500)
+            data.pressure = min(max(data.pressure, 800), 1100)
             
             # 确保风向在0-360度范围内
             data.wind_direction = data.wind_direction % 360
@@ -850,6 +772,37 @@ class WeatherService(IWeatherService):
             self.logger.error(f"清理天气数据时出错: {e}")
             return data
     
+    def _sanitize_hourly_batch(
+        self, 
+        hours: List[Dict[str, Any]], 
+        units: str = "metric"
+    ) -> List[Dict[str, Any]]:
+        """
+        批量清理小时预报数据
+        
+        使用与 _sanitize_weather_data 相同的范围，在一次遍历中原地修正所有条目。
+        英制单位下温度范围换算为华氏度（-148°F 至 140°F）。
+        
+        Args:
+            hours: 小时预报条目列表
+            units: 单位制（metric/imperial）
+            
+        Returns:
+            清理后的小时预报条目列表
+        """
+        if units == "imperial":
+            min_temp, max_temp = -148, 140
+        else:
+            min_temp, max_temp = -100, 60
+        
+        for hour in hours:
+            hour['temperature'] = min(max(hour['temperature'], min_temp), max_temp)
+            hour['humidity'] = min(max(hour['humidity'], 0), 100)
+            hour['wind_speed'] = min(max(hour['wind_speed'], 0), 500)
+            hour['pressure'] = min(max(hour['pressure'], 800), 1100)
+            hour['wind_direction'] %= 360
+        return hours
+    
     def _convert_current_weather_data(
         self, 
         raw_data: Dict[str, Any], 